@@ -1,6 +1,7 @@
 from django.conf import settings
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
+from video_downloading_platform.core.api.views import URLSubmissionViewSet
 from video_downloading_platform.users.api.views import UserViewSet
 
 if settings.DEBUG:
@@ -9,6 +10,7 @@ else:
     router = SimpleRouter()
 
 router.register("users", UserViewSet)
+router.register("submissions", URLSubmissionViewSet, basename="submission")
 
 
 app_name = "api"
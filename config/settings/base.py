@@ -180,6 +180,34 @@ MINIO_STORAGE_SECRET_KEY = env('MINIO_SECRET_KEY')
 MINIO_STORAGE_USE_HTTPS = False
 MINIO_STORAGE_MEDIA_BUCKET_NAME = 'local-media'
 MINIO_STORAGE_AUTO_CREATE_MEDIA_BUCKET = True
+# Public URL of the media bucket, required along with presigned URLs for the redirect serving mode
+MINIO_STORAGE_MEDIA_URL = env('MINIO_STORAGE_MEDIA_URL', default=None)
+MINIO_STORAGE_MEDIA_USE_PRESIGNED = env.bool('MINIO_STORAGE_MEDIA_USE_PRESIGNED', default=False)
+# Size of the buffers used to stream files from and to the storage
+STORAGE_CHUNK_SIZE = 8 * 1024 * 1024
+# Size of the parts of streamed multipart uploads, at least 5 MiB
+STORAGE_MULTIPART_PART_SIZE = 16 * 1024 * 1024
+# Number of leading bytes used to detect the MIME type of ingested files
+INGEST_MIME_SNIFF_SIZE = 1024 * 1024
+# Storage quotas in bytes, new download requests and uploads are refused once reached, 0 means unlimited
+STORAGE_QUOTA_PER_USER = env.int('STORAGE_QUOTA_PER_USER', default=0)
+STORAGE_QUOTA_PER_COLLECTION = env.int('STORAGE_QUOTA_PER_COLLECTION', default=0)
+# Redirect clients to pre-signed MinIO URLs instead of streaming the contents through Django
+CONTENT_SERVING_REDIRECT = env.bool('CONTENT_SERVING_REDIRECT', default=False)
+CONTENT_PRESIGNED_URL_MAX_AGE = 60 * 60
+# Collection ZIP downloads announce their length only up to this many archives, each one costs a storage lookup
+COLLECTION_ZIP_MAX_SIZED_ENTRIES = 50
+# Bounding box and JPEG quality of the generated thumbnails
+THUMBNAIL_SIZE = (480, 480)
+THUMBNAIL_QUALITY = 80
+# Thumbnails never change once generated, let browsers keep them
+THUMBNAIL_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+# Missing thumbnails are created in the background, at most once per this many seconds for a content
+THUMBNAIL_PENDING_TTL = 10 * 60
+# Lifetime in seconds of the per user batch statuses, polled by every open page
+BATCH_STATUSES_CACHE_TTL = 5
+# Upper bound of the lifetime of the cached visible batches, they are invalidated on batch and team changes anyway
+BATCH_VISIBILITY_CACHE_TTL = 10 * 60
 
 # TEMPLATES
 # ------------------------------------------------------------------------------
@@ -318,10 +346,40 @@ MARKDOWNIFY_MARKDOWN_EXTENSIONS = ['markdown.extensions.nl2br']
 TAGGIT_CASE_INSENSITIVE = True
 
 # Django Q
+REDIS_URL = env("REDIS_URL")
+# Named task queues, each one is served by its own pool of workers: a django-q cluster started with
+# Q_CLUSTER_NAME set to the name of the queue. Bulk work cannot delay interactive tasks this way.
+TASK_QUEUES = {
+    'interactive': 'Backend',
+    'bulk': 'Backend-bulk',
+    'maintenance': 'Backend-maintenance',
+}
+# Download requests of users with more pending requests than this are queued as bulk work
+TASK_BULK_THRESHOLD = env.int('TASK_BULK_THRESHOLD', default=10)
+# Rows per INSERT and URLs per probing task when download requests are submitted in bulk
+SUBMISSION_BATCH_SIZE = 1000
+# Most items a single API submission can hold
+SUBMISSION_MAX_ITEMS = env.int('SUBMISSION_MAX_ITEMS', default=100000)
+# URLs submitted in automatic mode that match no specific yt-dlp extractor are probed in the background, at most
+# this many at once, and the result is cached per domain for URL_PROBE_CACHE_TTL seconds
+URL_PROBE_CONCURRENCY = 8
+URL_PROBE_TIMEOUT = 20
+URL_PROBE_CACHE_TTL = 24 * 60 * 60
+# Fair-share dispatching of the download requests, see core.dispatch. Enqueued requests are released to the
+# workers by weighted round-robin across users and collections, within the capacity. The per-user cap only holds
+# while other users have requests waiting.
+DOWNLOAD_DISPATCH_CAPACITY = env.int('DOWNLOAD_DISPATCH_CAPACITY', default=12)
+DOWNLOAD_MAX_ACTIVE_PER_USER = env.int('DOWNLOAD_MAX_ACTIVE_PER_USER', default=4)
+# Round-robin weight of some users by username, 1 for the others
+DOWNLOAD_USER_WEIGHTS = {}
+# Released requests still not finished after this many seconds no longer count against the caps
+DOWNLOAD_DISPATCH_TIMEOUT = 2 * 60 * 60
+# Workers are restarted after Q_CLUSTER_RECYCLE tasks or once they use more than max_rss KB, a worker lives long
+# enough to reuse its exiftool process across tasks while leaks of the downloaders stay bounded
 Q_CLUSTER = {
-    'name': 'Backend',
-    'workers': 4,
-    'recycle': 1,
+    'name': env('Q_CLUSTER_NAME', default=TASK_QUEUES['interactive']),
+    'workers': env.int('Q_CLUSTER_WORKERS', default=4),
+    'recycle': env.int('Q_CLUSTER_RECYCLE', default=100),
     'retry': 36*60,
     'max_attempts': 5,
     'timeout': 35*60,
@@ -331,9 +389,35 @@ Q_CLUSTER = {
     'queue_limit': 50,
     'cpu_affinity': 4,
     'label': 'Django Q',
-    'redis': env("REDIS_URL")
+    'redis': REDIS_URL
 }
 
+# Live status updates
+STATUS_EVENTS_CHANNEL = 'vhs:statuses'
+# Seconds between two keep-alive comments on idle streams
+STATUS_EVENTS_HEARTBEAT = 20
+# Streams are closed after this many seconds, browsers reconnect after STATUS_EVENTS_RETRY seconds
+STATUS_EVENTS_MAX_DURATION = 5 * 60
+STATUS_EVENTS_RETRY = 2
+
 # Elastic Search
 ELASTICSEARCH_HOST = env("ELASTICSEARCH_HOST", default="elasticsearch")
 ELASTICSEARCH_HOSTS = ["elasticsearch"]
+# Alias covering every collection index, visibility is enforced by filtering on the collection IDs
+ELASTICSEARCH_SEARCH_ALIAS = "collections"
+# Number of results per search page and of values per facet
+SEARCH_PAGE_SIZE = 50
+SEARCH_FACET_SIZE = 10
+# Bulk indexing: a chunk is sent as soon as it reaches either of these limits
+ELASTICSEARCH_BULK_CHUNK_SIZE = env.int("ELASTICSEARCH_BULK_CHUNK_SIZE", default=500)
+ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = env.int("ELASTICSEARCH_BULK_MAX_CHUNK_BYTES", default=10 * 1024 * 1024)
+ELASTICSEARCH_BULK_MAX_RETRIES = 3
+
+# Statistics
+# Snapshots are recomputed from scratch at this interval in seconds, to account for deleted objects, and kept as
+# history. They are updated incrementally in between.
+STATISTICS_FULL_REFRESH_INTERVAL = 24 * 60 * 60
+# Incremental snapshots older than this many seconds are pruned, full ones are kept as history
+STATISTICS_HISTORY_RETENTION = 7 * 24 * 60 * 60
+# Number of full snapshots shown in the statistics history
+STATISTICS_HISTORY_SIZE = 30
@@ -18,6 +18,7 @@ from video_downloading_platform.core.views import (
     get_downloaded_content_view,
     my_batches_view,
     get_downloaded_file_view, archive_batch_view, get_report_archive_view, get_batch_status_view,
+    batch_status_events_view, batch_contents_view,
     reopen_batch_view, BatchTeamUpdateView, download_collection_zip_view,
     hide_download_request_view, show_download_request_view, mark_all_notification_read_view, batch_edit_view,
     edit_download_request_view, statistics_view, add_content_to_batch_view, search_view,
@@ -45,6 +46,7 @@ urlpatterns = [
   path("inbox/read_all", mark_all_notification_read_view, name="mark_all_notification_read"),
   path("batch/list", my_batches_view, name="batch_list"),
   path("batch/statuses", get_batch_status_view, name="get_batch_status"),
+  path("batch/statuses/events", batch_status_events_view, name="batch_status_events"),
   path("batch/<str:batch_id>/add", add_content_to_batch_view, name="add_content_to_batch"),
   path("batch/<str:batch_id>/close", close_batch_view, name="close_batch"),
   path("batch/<str:batch_id>/reopen", reopen_batch_view, name="reopen_batch"),
@@ -52,6 +54,7 @@ urlpatterns = [
   path("batch/<str:batch_id>/delete", delete_batch_view, name="delete_batch"),
   path("batch/<str:batch_id>/download", download_collection_zip_view, name="download_batch_archive"),
   path("batch/<str:batch_id>/details", batch_details_view, name="batch_details"),
+  path("batch/<str:batch_id>/contents", batch_contents_view, name="batch_contents"),
   path("batch/<str:batch_id>/edit", batch_edit_view, name="batch_edit"),
   path("batch_team/<int:pk>", BatchTeamUpdateView.as_view(), name="edit_batch_team"),
   path("request/<str:request_id>/edit", edit_download_request_view, name="edit_download_request"),
@@ -4,12 +4,13 @@ from video_downloading_platform.core.models import (
     Batch,
     DownloadRequest,
     DownloadReport,
-    DownloadedContent, UploadRequest, PlatformCredentials
+    DownloadedContent, UploadRequest, PlatformCredentials, StorageUsage, ContentBlob,
+    URLSubmission
 )
 
 
 class BatchAdmin(admin.ModelAdmin):
-    list_display = ('name', 'owner', 'created_at', 'updated_at', 'url_count')
+    list_display = ('name', 'owner', 'created_at', 'updated_at', 'url_count', 'size_bytes')
 
 
 admin.site.register(Batch, BatchAdmin)
@@ -30,7 +31,7 @@ admin.site.register(DownloadReport, DownloadReportAdmin)
 
 
 class DownloadedContentAdmin(admin.ModelAdmin):
-    list_display = ('name', 'mime_type')
+    list_display = ('name', 'mime_type', 'size_bytes')
 
 
 admin.site.register(DownloadedContent, DownloadedContentAdmin)
@@ -48,3 +49,25 @@ class PlatformCredentialsAdmin(admin.ModelAdmin):
 
 
 admin.site.register(PlatformCredentials, PlatformCredentialsAdmin)
+
+
+class StorageUsageAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'size_bytes', 'updated_at')
+
+
+admin.site.register(StorageUsage, StorageUsageAdmin)
+
+
+class ContentBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size_bytes', 'ref_count', 'created_at')
+
+
+admin.site.register(ContentBlob, ContentBlobAdmin)
+
+
+class URLSubmissionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'batch', 'status', 'received_count', 'accepted_count', 'created_at')
+    exclude = ('items',)
+
+
+admin.site.register(URLSubmission, URLSubmissionAdmin)
@@ -0,0 +1,26 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline delimited JSON, one value per line. The body is read line by line and parsed into the list of values.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        values = []
+        for number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values.append(json.loads(line.decode(encoding)))
+            except ValueError as e:
+                raise ParseError(f'NDJSON parse error on line {number} - {e}')
+        return values
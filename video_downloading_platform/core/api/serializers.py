@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.validators import FileExtensionValidator
+from rest_framework import serializers
+
+from video_downloading_platform.core.models import Batch, DownloadRequest, URLSubmission
+
+# Statuses of the download requests counted by each progress counter of a submission
+REQUEST_PROGRESS = {
+    'pending': [DownloadRequest.Status.CREATED, DownloadRequest.Status.ENQUEUED],
+    'processing': [DownloadRequest.Status.PROCESSING, DownloadRequest.Status.POST_PROCESSING],
+    'succeeded': [DownloadRequest.Status.SUCCEEDED],
+    'failed': [DownloadRequest.Status.FAILED],
+    'cancelled': [DownloadRequest.Status.CANCELLED],
+}
+
+
+class URLSubmissionSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='api:submission-detail')
+    collection = serializers.UUIDField(source='batch_id', read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = URLSubmission
+        fields = [
+            'id', 'url', 'collection', 'status', 'type', 'content_warning', 'tags', 'created_at', 'updated_at',
+            'received_count', 'accepted_count', 'duplicate_count', 'rejected_count', 'progress', 'errors', 'message',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, submission):
+        # Annotated by URLSubmissionViewSet.get_queryset
+        return {name: getattr(submission, f'{name}_requests', 0) for name in REQUEST_PROGRESS}
+
+
+class URLSubmissionCreateSerializer(serializers.Serializer):
+    collection = serializers.PrimaryKeyRelatedField(queryset=Batch.objects.all())
+    type = serializers.ChoiceField(choices=DownloadRequest.REQUEST_TYPE, default=DownloadRequest.AUTOMATIC)
+    content_warning = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None)
+    tags = serializers.ListField(child=serializers.CharField(max_length=100), required=False, default=list)
+    # Items are only validated when processed in the background, see process_url_submission
+    items = serializers.ListField(required=False, allow_empty=False, max_length=settings.SUBMISSION_MAX_ITEMS)
+    source = serializers.FileField(required=False, validators=[FileExtensionValidator(['csv', 'txt'])])
+
+    def validate_collection(self, batch):
+        if not Batch.get_users_open_batches(self.context['request'].user).filter(id=batch.id).exists():
+            raise serializers.ValidationError('You cannot add content to this collection.')
+        return batch
+
+    def validate(self, attrs):
+        if ('items' in attrs) == ('source' in attrs):
+            raise serializers.ValidationError('Submit either items or a source file.')
+        return attrs
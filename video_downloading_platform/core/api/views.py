@@ -0,0 +1,99 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from rest_framework import serializers, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from video_downloading_platform.core.models import URLSubmission
+from video_downloading_platform.core.quotas import check_storage_quota
+from video_downloading_platform.core.submission import queue_url_submission
+
+from .parsers import NDJSONParser
+from .serializers import REQUEST_PROGRESS, URLSubmissionCreateSerializer, URLSubmissionSerializer
+
+
+class URLSubmissionViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
+    """
+    Submit URLs to download into a collection. The body is either a JSON object with the `collection`, the `items`
+    and optionally the `type`, `content_warning` and `tags`, or an NDJSON stream of items with the other fields given
+    as query parameters. Items are URLs or objects with a `url` and their own `content_warning` and `tags`. A CSV or
+    text list can be uploaded instead as a multipart `source` file.
+    Retrying with the same `Idempotency-Key` header returns the original submission.
+    """
+    serializer_class = URLSubmissionSerializer
+    queryset = URLSubmission.objects.all()
+    parser_classes = [JSONParser, NDJSONParser, MultiPartParser]
+
+    def get_queryset(self, *args, **kwargs):
+        return self.queryset \
+            .filter(owner=self.request.user) \
+            .defer('items') \
+            .annotate(**{
+                f'{name}_requests': Count('download_requests', filter=Q(download_requests__status__in=statuses))
+                for name, statuses in REQUEST_PROGRESS.items()
+            })
+
+    def _get_idempotency_key(self):
+        key = self.request.headers.get('Idempotency-Key') or None
+        if key and len(key) > URLSubmission._meta.get_field('idempotency_key').max_length:
+            raise serializers.ValidationError({'Idempotency-Key': 'Too long.'})
+        return key
+
+    def _get_query_fields(self):
+        params = self.request.query_params
+        fields = {name: params[name] for name in ('collection', 'type', 'content_warning') if name in params}
+        if 'tags' in params:
+            fields['tags'] = params.getlist('tags')
+        return fields
+
+    def _respond(self, submission_id, response_status):
+        serializer = self.get_serializer(self.get_queryset().get(id=submission_id))
+        return Response(status=response_status, data=serializer.data)
+
+    def create(self, request, *args, **kwargs):
+        idempotency_key = self._get_idempotency_key()
+        if idempotency_key:
+            existing = URLSubmission.objects.filter(owner=request.user, idempotency_key=idempotency_key).first()
+            if existing:
+                return self._respond(existing.id, status.HTTP_200_OK)
+
+        data = request.data
+        if isinstance(data, list):
+            data = {**self._get_query_fields(), 'items': data}
+        serializer = URLSubmissionCreateSerializer(data=data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        batch = serializer.validated_data['collection']
+        try:
+            check_storage_quota(request.user, batch)
+        except ValidationError as e:
+            raise PermissionDenied(' '.join(e.messages))
+
+        items = serializer.validated_data.get('items')
+        submission = URLSubmission(
+            owner=request.user,
+            batch=batch,
+            idempotency_key=idempotency_key,
+            type=serializer.validated_data['type'],
+            content_warning=serializer.validated_data['content_warning'],
+            tags=serializer.validated_data['tags'],
+            items=items,
+            received_count=len(items) if items else 0
+        )
+        source = serializer.validated_data.get('source')
+        if source:
+            submission.source.save(source.name, source, save=False)
+        try:
+            with transaction.atomic():
+                submission.save(force_insert=True)
+        except IntegrityError:
+            # Submitted concurrently with the same key
+            if submission.source:
+                submission.source.delete(save=False)
+            existing = URLSubmission.objects.get(owner=request.user, idempotency_key=idempotency_key)
+            return self._respond(existing.id, status.HTTP_200_OK)
+        queue_url_submission(submission)
+        return self._respond(submission.id, status.HTTP_202_ACCEPTED)
@@ -0,0 +1,94 @@
+import io
+import json
+import zipfile
+from collections import namedtuple
+
+from video_downloading_platform.core.models import DownloadReport
+from video_downloading_platform.core.storage import stream_stored_file
+
+
+def write_report_archive(download_report: DownloadReport, fileobj):
+    """
+    Write the ZIP archive of a download report into `fileobj`, which does not need to be seekable. Contents are
+    streamed from the storage chunk by chunk and their exif and metadata JSON files are generated on the fly.
+    """
+    with zipfile.ZipFile(fileobj, 'w') as zf:
+        for downloaded_content in download_report.downloadedcontent_set.all():
+            if not downloaded_content.content:
+                continue
+            with zf.open(downloaded_content.name, mode='w', force_zip64=True) as entry:
+                for chunk in stream_stored_file(downloaded_content.content):
+                    entry.write(chunk)
+            if downloaded_content.exif_data:
+                zf.writestr(f'{downloaded_content.name}-exif.json', json.dumps(downloaded_content.exif_data, indent=2))
+            if downloaded_content.metadata:
+                zf.writestr(
+                    f'{downloaded_content.name}-metadata.json', json.dumps(downloaded_content.metadata, indent=2)
+                )
+
+
+ZipStreamEntry = namedtuple('ZipStreamEntry', ['name', 'size', 'date_time', 'chunks'])
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ZipStream:
+    """
+    Generate a ZIP archive chunk by chunk with a constant memory footprint. Entries are stored uncompressed with
+    ZIP64 extensions, `chunks` being a callable returning an iterator over the content of the entry. When the sizes
+    of all the entries are known in advance, the exact length of the archive is known before streaming it.
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+
+    @property
+    def size(self):
+        if any(entry.size is None for entry in self.entries):
+            return None
+        offset = 0
+        central_directory_size = 0
+        for entry in self.entries:
+            name_length = len(entry.name.encode('utf-8'))
+            zip64_fields = 0
+            if entry.size > zipfile.ZIP64_LIMIT:
+                zip64_fields += 2
+            if offset > zipfile.ZIP64_LIMIT:
+                zip64_fields += 1
+            central_directory_size += 46 + name_length + (4 + 8 * zip64_fields if zip64_fields else 0)
+            # Local header with its ZIP64 extra field, data and ZIP64 data descriptor
+            offset += 30 + name_length + 20 + entry.size + 24
+        end_record_size = 22
+        if len(self.entries) > zipfile.ZIP_FILECOUNT_LIMIT or offset > zipfile.ZIP64_LIMIT \
+                or central_directory_size > zipfile.ZIP64_LIMIT:
+            end_record_size += 56 + 20
+        return offset + central_directory_size + end_record_size
+
+    def __iter__(self):
+        buffer = _ZipStreamBuffer()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            for entry in self.entries:
+                zinfo = zipfile.ZipInfo(entry.name, date_time=entry.date_time)
+                zinfo.file_size = entry.size or 0
+                with zf.open(zinfo, mode='w', force_zip64=True) as f:
+                    for chunk in entry.chunks():
+                        f.write(chunk)
+                        yield buffer.drain()
+                yield buffer.drain()
+        yield buffer.drain()
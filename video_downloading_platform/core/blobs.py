@@ -0,0 +1,81 @@
+import logging
+
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from video_downloading_platform.core.models import ContentBlob
+
+logger = logging.getLogger(__name__)
+
+# Tries to store a blob which keeps being released concurrently
+ACQUIRE_ATTEMPTS = 3
+
+
+def _add_reference(sha256):
+    """
+    Add a reference to the blob of the given SHA256 if it exists. The row is locked so that it cannot be released
+    concurrently.
+    """
+    with transaction.atomic():
+        blob = ContentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob:
+            ContentBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+            blob.ref_count += 1
+        return blob
+
+
+def acquire_blob(file, sha256, size):
+    """
+    Return the blob storing the given opened file, with one more reference. The file is only uploaded if no blob
+    with the same SHA256 is stored yet.
+    """
+    blob = _add_reference(sha256)
+    if blob:
+        return blob
+
+    blob = ContentBlob(sha256=sha256, size_bytes=size, ref_count=1)
+    for _ in range(ACQUIRE_ATTEMPTS):
+        if not blob.content or not blob.content.storage.exists(blob.content.name):
+            # The first time, or the object was deleted along with a blob released meanwhile
+            file.seek(0)
+            blob.content.save(sha256, File(file), save=False)
+        try:
+            with transaction.atomic():
+                blob.save(force_insert=True)
+            return blob
+        except IntegrityError:
+            pass
+
+        # Stored concurrently by another ingest, drop our copy unless both uploads ended up on the same object
+        existing = _add_reference(sha256)
+        if existing:
+            if existing.content.name != blob.content.name:
+                blob.content.delete(save=False)
+            return existing
+        # Released and deleted since the insert failed, try again
+    raise IntegrityError(f'Unable to store the blob {sha256}')
+
+
+def release_blob(sha256):
+    """
+    Remove a reference to the blob of the given SHA256, the blob is deleted when it was the last one and its stored
+    file once the transaction commits.
+    """
+    with transaction.atomic():
+        blob = ContentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if not blob:
+            return
+        if blob.ref_count > 1:
+            ContentBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') - 1)
+            return
+        blob.delete()
+    # The stored file is only deleted once the blob row is gone for good
+    transaction.on_commit(lambda: _delete_stored_file(blob.content))
+
+
+def _delete_stored_file(content):
+    try:
+        content.delete(save=False)
+    except Exception as e:
+        logger.error(e)
@@ -0,0 +1,157 @@
+import logging
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from video_downloading_platform.core.events import publish_batch_statuses
+from video_downloading_platform.core.models import DownloadRequest
+from video_downloading_platform.core.queues import get_submission_queue, pipelined_broker
+
+logger = logging.getLogger(__name__)
+
+LOCK_CACHE_KEY = 'download_dispatch:lock'
+
+
+def _get_weight(owner_id, usernames):
+    return max(1, settings.DOWNLOAD_USER_WEIGHTS.get(usernames.get(owner_id), 1))
+
+
+def plan_dispatch(pending, active, capacity, max_active_per_user, weights):
+    """
+    Pick the pending requests to release by weighted round-robin: on each round every user gets as many requests as
+    their weight, the users with the fewest active requests first, and each user's requests are taken from their
+    collections in turn. Users are held to `max_active_per_user` active requests while others have requests
+    pending, the capacity left once every user reached the cap is shared by the same round-robin.
+    `pending` maps each user to their collections, each one mapped to its pending request IDs oldest first.
+    `active` maps each user to their number of requests being downloaded.
+    """
+    slots = {owner_id: max_active_per_user - active.get(owner_id, 0) for owner_id in pending}
+    rotations = {owner_id: deque(batches.keys()) for owner_id, batches in pending.items()}
+    queues = {
+        owner_id: {batch_id: deque(request_ids) for batch_id, request_ids in batches.items()}
+        for owner_id, batches in pending.items()
+    }
+    owners = sorted(pending.keys(), key=lambda owner_id: active.get(owner_id, 0))
+    released = []
+    capped = True
+    while capacity > 0:
+        released_in_round = 0
+        for owner_id in owners:
+            rotation = rotations[owner_id]
+            for _ in range(weights.get(owner_id, 1)):
+                if capacity <= 0 or (capped and slots[owner_id] <= 0) or not rotation:
+                    break
+                batch_id = rotation.popleft()
+                request_ids = queues[owner_id][batch_id]
+                released.append(request_ids.popleft())
+                if request_ids:
+                    rotation.append(batch_id)
+                slots[owner_id] -= 1
+                capacity -= 1
+                released_in_round += 1
+        if not released_in_round:
+            if not capped:
+                break
+            # Nobody else is waiting, the capacity is not left idle
+            capped = False
+    return released
+
+
+def _get_active_counts():
+    since = timezone.now() - timedelta(seconds=settings.DOWNLOAD_DISPATCH_TIMEOUT)
+    rows = DownloadRequest.objects \
+        .filter(dispatched_at__gt=since,
+                status__in=[DownloadRequest.Status.ENQUEUED, DownloadRequest.Status.PROCESSING]) \
+        .order_by() \
+        .values('owner_id') \
+        .annotate(count=Count('id')) \
+        .values_list('owner_id', 'count')
+    return dict(rows)
+
+
+def _get_pending(capacity):
+    """
+    Pending requests grouped by user and collection. Only the oldest ones that could be released in this pass are
+    fetched for each collection.
+    """
+    held = DownloadRequest.objects.filter(status=DownloadRequest.Status.ENQUEUED, dispatched_at__isnull=True)
+    rows = held.order_by().values('owner_id', 'batch_id').annotate(count=Count('id'))
+    pending = {}
+    pending_counts = {}
+    for row in rows:
+        owner_id = row['owner_id']
+        pending_counts[owner_id] = pending_counts.get(owner_id, 0) + row['count']
+        # Users over the cap can still get the capacity nobody else claims
+        request_ids = held.filter(batch_id=row['batch_id'], owner_id=owner_id) \
+            .order_by('created_at') \
+            .values_list('id', flat=True)[:capacity]
+        pending.setdefault(owner_id, {})[row['batch_id']] = list(request_ids)
+    return pending, pending_counts
+
+
+def dispatch_download_requests():
+    """
+    Release enqueued download requests to the workers, sharing the capacity between users and collections.
+    Called when requests are submitted, when a download finishes and periodically. Returns the number of released
+    requests.
+    """
+    if not cache.add(LOCK_CACHE_KEY, 1, 60):
+        return 0
+    try:
+        active = _get_active_counts()
+        capacity = settings.DOWNLOAD_DISPATCH_CAPACITY - sum(active.values())
+        if capacity <= 0:
+            return 0
+        pending, pending_counts = _get_pending(capacity)
+        if not pending:
+            return 0
+        usernames = dict(get_user_model().objects.filter(id__in=pending.keys()).values_list('id', 'username'))
+        weights = {owner_id: _get_weight(owner_id, usernames) for owner_id in pending}
+        request_ids = plan_dispatch(pending, active, capacity, settings.DOWNLOAD_MAX_ACTIVE_PER_USER, weights)
+
+        # Only release the requests still waiting, they could have been cancelled or released meanwhile
+        with transaction.atomic():
+            request_ids = list(
+                DownloadRequest.objects
+                .select_for_update(skip_locked=True)
+                .filter(id__in=request_ids, status=DownloadRequest.Status.ENQUEUED, dispatched_at__isnull=True)
+                .values_list('id', flat=True)
+            )
+            DownloadRequest.objects.filter(id__in=request_ids).update(dispatched_at=timezone.now())
+
+        per_queue = {}
+        batch_ids = set()
+        for download_request in DownloadRequest.objects.filter(id__in=request_ids):
+            queue = get_submission_queue(pending_counts.get(download_request.owner_id, 0))
+            per_queue.setdefault(queue, []).append(download_request)
+            batch_ids.add(download_request.batch_id)
+        released = 0
+        for queue, download_requests in per_queue.items():
+            try:
+                with pipelined_broker(queue) as broker:
+                    for download_request in download_requests:
+                        download_request.release(queue, broker)
+                released += len(download_requests)
+            except Exception as e:
+                # Held again so that the next pass releases them
+                logger.exception(e)
+                DownloadRequest.objects \
+                    .filter(id__in=[download_request.id for download_request in download_requests]) \
+                    .update(dispatched_at=None)
+        publish_batch_statuses(batch_ids)
+        return released
+    except Exception as e:
+        logger.exception(e)
+        return 0
+    finally:
+        cache.delete(LOCK_CACHE_KEY)
+
+
+def on_download_finished(task):
+    dispatch_download_requests()
@@ -0,0 +1,195 @@
+from urllib.parse import urlparse
+
+from dateutil.parser import parse
+from django.db.models import Prefetch
+
+from video_downloading_platform.core.indexing import Entity
+from video_downloading_platform.core.models import DownloadRequest, DownloadReport, DownloadedContent
+
+THUMBNAIL_MIME_TYPES = ['image/jpeg', 'image/png', 'image/webp']
+
+
+def _try_recovering_date(d, default='1970-01-01'):
+    try:
+        return parse(d)
+    except Exception:
+        return parse(default)
+
+
+def _parse_exif(exif):
+    ignore = [
+        'ICC_Profile',
+        'Composite',
+        'Photoshop',
+        'JFIF',
+        'MakerNotes',
+        'APP14',
+    ]
+    data = {}
+
+    if not exif or type(exif) is list:
+        return data
+
+    def should_ignore(key: str):
+        if ':' in key:
+            key = key.split(':')[0]
+        return bool(key in ignore)
+
+    for k, v in exif.items():
+        if should_ignore(k):
+            continue
+        k = k.replace(':', '_')
+        if 'date' in k.lower():
+            data[k] = _try_recovering_date(v)
+        elif type(v) is set:
+            data[k] = list(v)
+        else:
+            data[k] = v
+    return data
+
+
+def get_in_dict(keys, obj, default=''):
+    for k in keys:
+        if k in obj:
+            val = obj.get(k)
+            if not val or val == 'none':
+                return default
+            return val
+    return default
+
+
+class ThumbnailResolver:
+    """
+    In-memory equivalent of `DownloadReport.get_thumbnail_id_for` working on the already loaded contents of a report.
+    """
+
+    def __init__(self, contents):
+        self.images = [c for c in contents if c.mime_type in THUMBNAIL_MIME_TYPES]
+        self.default_id = next((c.id for c in self.images if c.name != 'webpage_screenshot.png'), None)
+
+    def resolve(self, content_name):
+        name = ''.join(content_name.split('.')[:-1]).lower()
+        for image in self.images:
+            if name in image.name.lower():
+                return image.id
+        return self.default_id
+
+
+def prefetch_for_indexing(requests):
+    """
+    Load everything needed to build the entities of the given download requests so that building them does not
+    hit the database anymore.
+    """
+    return requests.select_related('owner', 'batch').prefetch_related(
+        'tags',
+        Prefetch('report', queryset=DownloadReport.objects.prefetch_related('downloadedcontent_set')),
+    )
+
+
+def iter_requests_for_indexing(requests, chunk_size=200):
+    """
+    Iterate over a queryset of download requests, prefetching their related objects chunk by chunk.
+    """
+    request_ids = list(requests.values_list('id', flat=True))
+    for i in range(0, len(request_ids), chunk_size):
+        chunk = DownloadRequest.objects.filter(id__in=request_ids[i:i + chunk_size])
+        yield from prefetch_for_indexing(chunk)
+
+
+def build_entity(request: DownloadRequest, content: DownloadedContent, thumbnails: ThumbnailResolver, index_name: str):
+    entity = Entity()
+    entity.meta.id = str(content.id)
+    entity.meta.index = index_name
+    entity.created_at = request.created_at
+    entity.content_id = str(content.id)
+    entity.owner = str(request.owner.username)
+    entity.owner_id = str(request.owner.id)
+    entity.tags = [str(t) for t in request.tags.all()]
+    entity.request_id = str(request.id)
+    entity.is_hidden = bool(request.is_hidden)
+    entity.collection_id = str(request.batch.id)
+    entity.collection_name = str(request.batch.name)
+    entity.collection_description = str(request.batch.description)
+    entity.origin = request.url
+    entity.mimetype = content.mime_type
+    entity.md5 = content.md5
+    entity.sha256 = content.sha256
+    entity.status = request.get_status_display()
+    entity.thumbnail_content_id = thumbnails.resolve(content.name)
+    entity.exif = '\n'.join([f'{k}: {v}' for k, v in _parse_exif(content.exif_data).items()])
+    entity.content_warning = request.content_warning
+
+    if request.type == DownloadRequest.VIDEO or request.type == DownloadRequest.GALLERY:
+        entity.type = request.type.lower()
+        entity.stats = {
+            'view_count': get_in_dict([
+                'views',
+                'view_count',
+            ], content.metadata, -1),
+            'like_count': get_in_dict([
+                'reactions',
+                'like_count',
+                'fav_count',
+                'favourites_count',
+                'favorite_count'
+            ],  content.metadata, -1),
+            'comment_count': get_in_dict([
+                'replies',
+                'comment_count',
+                'replies_count',
+                'reply_count'
+            ], content.metadata, -1),
+        }
+        entity.post = {
+            'uploader': get_in_dict([
+                'uploader',
+            ], content.metadata),
+            'uploader_url': get_in_dict([
+                'uploader_url',
+            ], content.metadata),
+            'uploader_id': str(get_in_dict([
+                'uploader_id',
+            ], content.metadata, '-1'), ),
+            'title': get_in_dict([
+                'title',
+            ], content.metadata, content.name),
+            'description': get_in_dict([
+                'message',
+                'fulltitle',
+                'description',
+                'content',
+                'tag_string',
+            ], content.metadata),
+            'upload_date': _try_recovering_date(get_in_dict([
+                'date',
+                'edit_date',
+                'created_at',
+            ], content.metadata, '1970-01-01')),
+        }
+        entity.webpage_url = get_in_dict([
+            'webpage_url',
+        ], content.metadata)
+        entity.platform = get_in_dict([
+            'extractor_key',
+            'platform',
+        ], content.metadata, urlparse(request.url).netloc)
+
+    if request.url == 'http://dummy.url.local':
+        entity.origin = 'User upload'
+        entity.platform = 'VHS'
+        entity.post = {
+            'title': content.name,
+            'description': content.metadata.get('description'),
+        }
+    return entity
+
+
+def get_request_entities(request: DownloadRequest):
+    index_name = request.get_es_index()
+    for report in request.report.all():
+        contents = list(report.downloadedcontent_set.all())
+        thumbnails = ThumbnailResolver(contents)
+        for content in contents:
+            if content.name.endswith('.json') or content.name.endswith('.description'):
+                continue
+            yield build_entity(request, content, thumbnails, index_name)
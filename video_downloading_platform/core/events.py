@@ -0,0 +1,90 @@
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from video_downloading_platform.core.models import DownloadRequest
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def publish_batch_statuses(batch_ids):
+    """
+    Publish the counters of the given batches, for status changes made with bulk queries which do not go through
+    `DownloadRequest.save()`.
+    """
+    batch_ids = set(batch_ids)
+    if not batch_ids:
+        return
+    try:
+        counters = DownloadRequest.get_batches_status_counters(batch_ids)
+        pipeline = get_redis_client().pipeline(transaction=False)
+        for batch_id in batch_ids:
+            event = {'id': batch_id, **counters[batch_id]}
+            pipeline.publish(settings.STATUS_EVENTS_CHANNEL, json.dumps(event, cls=DjangoJSONEncoder))
+        pipeline.execute()
+    except Exception as e:
+        logger.error(f'Unable to publish the status of batches {batch_ids}: {e}')
+
+
+def publish_request_status(download_request: DownloadRequest):
+    """
+    Publish the new status of a download request along with the updated counters of its batch.
+    """
+    batch_id = download_request.batch_id
+    try:
+        counters = DownloadRequest.get_batches_status_counters([batch_id])
+        event = {
+            'id': batch_id,
+            **counters[batch_id],
+            'request': {'id': download_request.id, 'status': download_request.status},
+        }
+        get_redis_client().publish(settings.STATUS_EVENTS_CHANNEL, json.dumps(event, cls=DjangoJSONEncoder))
+    except Exception as e:
+        logger.error(f'Unable to publish the status of {download_request.id}: {e}')
+
+
+def subscribe_status_events():
+    pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(settings.STATUS_EVENTS_CHANNEL)
+    return pubsub
+
+
+def _format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def stream_status_events(pubsub, statuses):
+    """
+    Server-sent events stream starting with the current `statuses` of the visible batches, followed by the status
+    changes of these batches. The stream ends after STATUS_EVENTS_MAX_DURATION seconds, browsers reconnect on their
+    own, so that long-lived connections do not pin gunicorn threads forever.
+    """
+    batch_ids = {str(status['id']) for status in statuses}
+    deadline = time.monotonic() + settings.STATUS_EVENTS_MAX_DURATION
+    try:
+        yield f'retry: {settings.STATUS_EVENTS_RETRY * 1000}\n\n'
+        yield _format_event('statuses', statuses)
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=settings.STATUS_EVENTS_HEARTBEAT)
+            if message is None:
+                # Keep proxies from closing an idle connection and detect disconnected clients
+                yield ': keep-alive\n\n'
+                continue
+            event = json.loads(message['data'])
+            if event.get('id') in batch_ids:
+                yield _format_event('status', event)
+    finally:
+        pubsub.close()
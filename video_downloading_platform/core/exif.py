@@ -0,0 +1,99 @@
+import atexit
+import logging
+import os
+import threading
+
+import exiftool
+from exiftool.exceptions import ExifToolExecuteError
+
+logger = logging.getLogger(__name__)
+
+
+def is_exif_candidate(file_path):
+    if not file_path:
+        return False
+    if 'webpage_screenshot.png' in file_path:
+        return False
+    if file_path.endswith('.json') or file_path.endswith('.description'):
+        return False
+    return True
+
+
+class ExifToolProcess:
+    """
+    Long-lived exiftool process running in batch mode, reused across files and tasks by the worker which started it.
+    The process is checked before each use and restarted if it died.
+    """
+
+    def __init__(self):
+        self._helper = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._helper = exiftool.ExifToolHelper()
+        self._helper.run()
+        self._pid = os.getpid()
+
+    def _is_healthy(self):
+        if self._helper is None or not self._helper.running:
+            return False
+        try:
+            self._helper.execute('-ver')
+            return True
+        except Exception as e:
+            logger.warning(f'exiftool is not responding: {e}')
+            return False
+
+    def _ensure_running(self):
+        if self._pid != os.getpid():
+            # Started by the parent process before a fork, its pipes belong to the parent
+            self._helper = None
+        if not self._is_healthy():
+            self.terminate()
+            self._start()
+
+    def terminate(self):
+        if self._helper is not None and self._pid == os.getpid():
+            try:
+                self._helper.terminate()
+            except Exception as e:
+                logger.error(e)
+        self._helper = None
+
+    def _get_metadata_one_by_one(self, file_paths):
+        metadata = {}
+        for file_path in file_paths:
+            try:
+                metadata[file_path] = self._helper.get_metadata(file_path)[0]
+            except Exception as e:
+                logger.error(e)
+        return metadata
+
+    def get_metadata(self, file_paths):
+        """
+        Extract the metadata of all the given files with a single exiftool call. Returns a dict mapping each file
+        path to its metadata, unreadable files are missing from it.
+        """
+        if not file_paths:
+            return {}
+        with self._lock:
+            for _ in range(2):
+                try:
+                    self._ensure_running()
+                    return {m.get('SourceFile'): m for m in self._helper.get_metadata(file_paths)}
+                except ExifToolExecuteError:
+                    # At least one file could not be read, retry them individually to keep the others
+                    return self._get_metadata_one_by_one(file_paths)
+                except Exception as e:
+                    logger.error(e)
+                    self.terminate()
+        return {}
+
+
+exiftool_process = ExifToolProcess()
+atexit.register(exiftool_process.terminate)
+
+
+def get_exif_data(file_paths):
+    return exiftool_process.get_metadata([f for f in file_paths if is_exif_candidate(f)])
@@ -1,11 +1,15 @@
+import logging
+
 from django import forms
-from django.conf import settings
 from django.contrib.admin.widgets import FilteredSelectMultiple
 from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
 from django.utils.translation import gettext_lazy as _
 
 from video_downloading_platform.core.models import Batch, BatchRequest, BatchTeam, DownloadRequest, UploadRequest
-from video_downloading_platform.core.utils import transform_hl_results
+from video_downloading_platform.core.search import search_contents
+
+logger = logging.getLogger(__name__)
 
 
 class BatchTeamForm(forms.ModelForm):
@@ -114,42 +118,49 @@ class UploadForm(forms.Form):
         return UploadRequest.objects.get(id=request_id)
 
 
+class URLImportForm(forms.Form):
+    source = forms.FileField(
+        label=_('List of URLs'),
+        help_text=_('A text file with one URL per line, or a CSV file with a url column.'),
+        validators=[FileExtensionValidator(['csv', 'txt'])]
+    )
+    type = forms.ChoiceField(
+        label=_('Type'),
+        choices=DownloadRequest.REQUEST_TYPE,
+        initial=DownloadRequest.AUTOMATIC
+    )
+    content_warning = forms.CharField(
+        label=_('Content warning'),
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 2, 'cols': 20}))
+
+
 class SearchForm(forms.Form):
     q = forms.CharField(
         max_length=128,
         label=_('Search among downloaded contents')
     )
-
-    def do_search(self, indexes=['c.*']):
-        q = self.cleaned_data['q']
-
-        query = {
-            "query": {
-                "query_string": {
-                    "default_field": "sha256",
-                    "query": q
-                }
-            },
-            "highlight": {
-                "fields": {
-                    "*": {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]}
-                }
-            },
-            "_source": [
-                "collection_id", "collection_name", "created_at", "mimetype", "origin", "owner", "platform",
-                "post.description", "post.title", "post.upload_date", "post.uploader", "sha256", "stats.comment_count",
-                "stats.like_count", "stats.view_count", "status", "tags", "thumbnail_content_id", "type", "is_hidden",
-                "request_id"
-            ],
-            "sort": {"created_at": "desc"},
-            "size": 250,
-        }
-
-        from elasticsearch import Elasticsearch
-        es = Elasticsearch(settings.ELASTICSEARCH_HOSTS)
+    platform = forms.CharField(required=False, widget=forms.HiddenInput())
+    mimetype = forms.CharField(required=False, widget=forms.HiddenInput())
+    uploader = forms.CharField(required=False, widget=forms.HiddenInput())
+    collection = forms.CharField(required=False, widget=forms.HiddenInput())
+    upload_date = forms.RegexField(regex=r'^\d{4}-\d{2}$', required=False, widget=forms.HiddenInput())
+
+    FILTERS = ['platform', 'mimetype', 'uploader', 'collection', 'upload_date']
+
+    def do_search(self, collection_ids=None, cursor=None):
+        """
+        Search the contents of the given collections, of all of them if `collection_ids` is None, and return the
+        page of results following `cursor`. The cursor is not part of the form so that a new query starts over.
+        """
+        filters = {name: self.cleaned_data.get(name) for name in SearchForm.FILTERS}
         try:
-            raw_results = es.search(index=indexes, body=query)
-            results = transform_hl_results(raw_results)
-            return results
-        except Exception:
-            return []
+            return search_contents(
+                self.cleaned_data['q'],
+                collection_ids=collection_ids,
+                filters=filters,
+                cursor=cursor,
+            )
+        except Exception as e:
+            logger.error(e)
+            return {'results': [], 'total': 0, 'facets': {}, 'next_cursor': None}
@@ -1,6 +1,27 @@
+import logging
 from datetime import datetime
 
-from elasticsearch_dsl import Document, Text, Keyword, Date, InnerDoc, Boolean, Integer
+from django.conf import settings
+from elasticsearch.helpers import streaming_bulk
+from elasticsearch_dsl import Document, Text, Keyword, Date, InnerDoc, Boolean, Integer, connections
+from elasticsearch_dsl.exceptions import ValidationException
+
+logger = logging.getLogger(__name__)
+
+
+def get_es_connection():
+    try:
+        return connections.get_connection()
+    except KeyError:
+        return connections.create_connection(hosts=settings.ELASTICSEARCH_HOSTS, timeout=20)
+
+
+def update_search_alias(es=None):
+    """
+    Add every existing collection index to the search alias.
+    """
+    es = es or get_es_connection()
+    return es.indices.put_alias(index='c.*', name=settings.ELASTICSEARCH_SEARCH_ALIAS)
 
 
 class User(InnerDoc):
@@ -43,8 +64,88 @@ class Entity(Document):
     # exif = Nested()
     description = Text(analyzer='snowball')
 
-    def save(self, **kwargs):
+    def touch(self):
         if self.created_at is None:
             self.created_at = datetime.now()
         self.updated_at = datetime.now()
+
+    def save(self, **kwargs):
+        self.touch()
         return super().save(**kwargs)
+
+
+class BulkIndexer:
+    """
+    Index entities through the Elasticsearch bulk API. Each collection index is initialized once per run and
+    documents are sent in chunks bounded by both their count and their size. Per-document failures are collected
+    in `errors` instead of interrupting the run.
+    """
+
+    def __init__(self, chunk_size=None, max_chunk_bytes=None):
+        self.chunk_size = chunk_size or settings.ELASTICSEARCH_BULK_CHUNK_SIZE
+        self.max_chunk_bytes = max_chunk_bytes or settings.ELASTICSEARCH_BULK_MAX_CHUNK_BYTES
+        self.es = get_es_connection()
+        self.prepared_indexes = set()
+        self.unavailable_indexes = set()
+        self.indexed = 0
+        self.errors = []
+
+    def prepare_index(self, index_name):
+        if index_name in self.prepared_indexes:
+            return True
+        if index_name in self.unavailable_indexes:
+            return False
+        try:
+            # Creates the index when missing, updates its mapping otherwise
+            Entity.init(index=index_name, using=self.es)
+            # Searches go through the alias rather than through the list of the collection indexes
+            self.es.indices.put_alias(index=index_name, name=settings.ELASTICSEARCH_SEARCH_ALIAS)
+        except Exception as e:
+            logger.error(e)
+            self.unavailable_indexes.add(index_name)
+            return False
+        self.prepared_indexes.add(index_name)
+        return True
+
+    def _add_error(self, index_name, document_id, error):
+        self.errors.append({
+            'index': index_name,
+            'id': document_id,
+            'error': error,
+        })
+
+    def _actions(self, entities):
+        for entity in entities:
+            index_name = entity.meta.index
+            if not self.prepare_index(index_name):
+                self._add_error(index_name, entity.meta.id, 'Index unavailable')
+                continue
+            entity.touch()
+            try:
+                entity.full_clean()
+            except ValidationException as e:
+                self._add_error(index_name, entity.meta.id, str(e))
+                continue
+            yield entity.to_dict(include_meta=True)
+
+    def index(self, entities):
+        """
+        Index the given entities, each of them must have its `meta.index` set. Returns the number of indexed
+        documents and the list of failures.
+        """
+        results = streaming_bulk(
+            self.es,
+            self._actions(entities),
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            max_retries=settings.ELASTICSEARCH_BULK_MAX_RETRIES,
+            raise_on_error=False,
+            raise_on_exception=False,
+        )
+        for ok, item in results:
+            if ok:
+                self.indexed += 1
+            else:
+                _, info = item.popitem()
+                self._add_error(info.get('_index'), info.get('_id'), info.get('error', info.get('status')))
+        return self.indexed, self.errors
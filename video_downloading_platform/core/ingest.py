@@ -0,0 +1,69 @@
+import hashlib
+
+import magic
+from django.conf import settings
+
+from video_downloading_platform.core.blobs import acquire_blob
+from video_downloading_platform.core.models import DownloadedContent
+
+
+class Digests:
+    def __init__(self):
+        self.md5 = hashlib.md5()
+        self.sha1 = hashlib.sha1()
+        self.sha256 = hashlib.sha256()
+
+    def update(self, data):
+        self.md5.update(data)
+        self.sha1.update(data)
+        self.sha256.update(data)
+
+    def hexdigests(self):
+        return {
+            'md5': self.md5.hexdigest(),
+            'sha1': self.sha1.hexdigest(),
+            'sha256': self.sha256.hexdigest(),
+        }
+
+
+def hash_file(file):
+    """
+    Hash the given opened file chunk by chunk from the start, return its digests and size.
+    """
+    digests = Digests()
+    size = 0
+    buffer = bytearray(settings.STORAGE_CHUNK_SIZE)
+    view = memoryview(buffer)
+    file.seek(0)
+    while True:
+        read = file.readinto(buffer)
+        if not read:
+            break
+        digests.update(view[:read])
+        size += read
+    return digests.hexdigests(), size
+
+
+def sniff_mime_type(file):
+    head = file.read(settings.INGEST_MIME_SNIFF_SIZE)
+    file.seek(0)
+    return magic.from_buffer(head, mime=True)
+
+
+def ingest_file(downloaded_content: DownloadedContent, file):
+    """
+    Store the given opened file as the content of `downloaded_content`. The file is hashed first so that it is only
+    uploaded when no other downloaded content has the same SHA256, the stored blob is shared otherwise.
+    The downloaded content is updated but not saved.
+    """
+    mime_type = sniff_mime_type(file)
+    digests, size = hash_file(file)
+    blob = acquire_blob(file, digests.get('sha256'), size)
+    downloaded_content.blob = blob
+    downloaded_content.content.name = blob.content.name
+    downloaded_content.md5 = digests.get('md5')
+    downloaded_content.sha256 = digests.get('sha256')
+    downloaded_content.size_bytes = size
+    downloaded_content.mime_type = mime_type
+    digests['mime_type'] = mime_type
+    return digests
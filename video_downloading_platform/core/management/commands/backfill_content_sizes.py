@@ -0,0 +1,32 @@
+from django.core.management import BaseCommand
+
+from video_downloading_platform.core.models import DownloadedContent
+from video_downloading_platform.core.quotas import recompute_storage_usage
+
+
+class Command(BaseCommand):
+    help = 'Record the size of the downloaded contents stored before sizes were tracked and recompute the quotas usage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        contents = DownloadedContent.objects.filter(size_bytes__isnull=True).only('id', 'content')
+        pending = []
+        updated = 0
+        for downloaded_content in contents.iterator(chunk_size=batch_size):
+            try:
+                downloaded_content.size_bytes = downloaded_content.content.size if downloaded_content.content else 0
+            except Exception as e:
+                self.stderr.write(f'Unable to get the size of {downloaded_content.id}: {e}')
+                continue
+            pending.append(downloaded_content)
+            if len(pending) >= batch_size:
+                DownloadedContent.objects.bulk_update(pending, ['size_bytes'])
+                updated += len(pending)
+                pending = []
+        DownloadedContent.objects.bulk_update(pending, ['size_bytes'])
+        updated += len(pending)
+        recompute_storage_usage()
+        self.stdout.write(self.style.SUCCESS(f'Size recorded for {updated} downloaded contents'))
@@ -0,0 +1,42 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from video_downloading_platform.core.models import ContentBlob, DownloadedContent
+
+
+class Command(BaseCommand):
+    help = 'Move the downloaded contents stored before deduplication to content-addressed blobs'
+
+    def handle(self, *args, **options):
+        contents = DownloadedContent.objects \
+            .filter(blob__isnull=True, sha256__isnull=False) \
+            .exclude(content='') \
+            .exclude(sha256='') \
+            .only('id', 'sha256', 'content', 'size_bytes')
+        adopted = 0
+        deduplicated = 0
+        for downloaded_content in contents.iterator():
+            with transaction.atomic():
+                blob = ContentBlob.objects.select_for_update().filter(sha256=downloaded_content.sha256).first()
+                if blob:
+                    ContentBlob.objects.filter(sha256=blob.sha256).update(ref_count=F('ref_count') + 1)
+                    duplicate = downloaded_content.content.name
+                else:
+                    # The first stored copy becomes the blob, without moving it
+                    blob = ContentBlob.objects.create(
+                        sha256=downloaded_content.sha256,
+                        content=downloaded_content.content.name,
+                        size_bytes=downloaded_content.size_bytes or 0,
+                        ref_count=1
+                    )
+                    duplicate = None
+                DownloadedContent.objects.filter(id=downloaded_content.id).update(
+                    blob=blob, content=blob.content.name
+                )
+            if duplicate:
+                downloaded_content.content.storage.delete(duplicate)
+                deduplicated += 1
+            else:
+                adopted += 1
+        self.stdout.write(self.style.SUCCESS(f'{adopted} blobs adopted, {deduplicated} duplicates deleted'))
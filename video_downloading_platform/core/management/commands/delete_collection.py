@@ -1,6 +1,8 @@
 from django.core.management import BaseCommand
 
 from video_downloading_platform.core.models import Batch
+from video_downloading_platform.core.queues import MAINTENANCE, enqueue
+from video_downloading_platform.core.tasks import delete_collection_by_id
 
 
 class Command(BaseCommand):
@@ -8,10 +10,16 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('collection_id', type=str)
+        parser.add_argument(
+            '--enqueue', action='store_true', help='Delete it in the background, on the maintenance queue'
+        )
 
     def handle(self, *args, **options):
         collection_id = options.get('collection_id', None)
-        if collection_id:
+        if collection_id and options['enqueue']:
+            enqueue(MAINTENANCE, delete_collection_by_id, collection_id)
+            self.stdout.write(self.style.SUCCESS(f'Deletion of {collection_id} enqueued.'))
+        elif collection_id:
             try:
                 collection = Batch.objects.get(id=collection_id)
                 collection.delete()
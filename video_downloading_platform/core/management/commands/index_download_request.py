@@ -1,7 +1,8 @@
 from django.core.management import BaseCommand
 
 from video_downloading_platform.core.models import DownloadRequest
-from video_downloading_platform.core.tasks import index_download_request
+from video_downloading_platform.core.queues import MAINTENANCE, enqueue
+from video_downloading_platform.core.tasks import index_download_requests, index_download_request_by_id
 
 
 class Command(BaseCommand):
@@ -9,19 +10,28 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('request_ids', nargs='+', type=str)
+        parser.add_argument(
+            '--enqueue', action='store_true', help='Index them in the background, on the maintenance queue'
+        )
 
     def handle(self, *args, **options):
-        for request_id in options['request_ids']:
-            print(request_id)
-            if request_id == '*':
-                for request in DownloadRequest.objects.all():
-                    index_download_request(request)
-                    self.stdout.write(self.style.SUCCESS(f'Successfully indexed the download request {request.id}'))
-
-            else:
-                request = DownloadRequest.objects.get(pk=request_id)
-                index_download_request(request)
-                self.stdout.write(self.style.SUCCESS(f'Successfully indexed the download request {request_id}'))
+        request_ids = options['request_ids']
+        if '*' in request_ids:
+            requests = DownloadRequest.objects.all()
+        else:
+            requests = DownloadRequest.objects.filter(pk__in=request_ids)
+
+        if options['enqueue']:
+            request_ids = [str(request_id) for request_id in requests.values_list('id', flat=True)]
+            for request_id in request_ids:
+                enqueue(MAINTENANCE, index_download_request_by_id, request_id)
+            self.stdout.write(self.style.SUCCESS(f'Indexing of {len(request_ids)} download requests enqueued'))
+            return
+
+        indexer = index_download_requests(requests)
+        for error in indexer.errors:
+            self.stderr.write(self.style.ERROR(f'Failed to index {error.get("id")}: {error.get("error")}'))
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {indexer.indexed} documents'))
 
 #http://localhost:8000/request/03e2c835-6183-4ff7-970b-58dad8b72b9e/hide
 #http://localhost:8000/request/278b7df2-238d-4b92-b889-ed93853d440e/show
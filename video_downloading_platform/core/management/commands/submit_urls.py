@@ -0,0 +1,54 @@
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management import BaseCommand, CommandError
+
+from video_downloading_platform.core.models import Batch, DownloadRequest, URLSubmission
+from video_downloading_platform.core.submission import process_url_submission
+
+
+class Command(BaseCommand):
+    help = 'Submit the URLs listed in a text file, one per line, or in a CSV file to the given collection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('collection_id', type=str)
+        parser.add_argument('username', type=str, help='User submitting the URLs')
+        parser.add_argument('file', type=str, help='File listing the URLs, - for the standard input')
+        parser.add_argument(
+            '--type', default=DownloadRequest.AUTOMATIC, choices=[t for t, _ in DownloadRequest.REQUEST_TYPE]
+        )
+        parser.add_argument('--content-warning', default=None)
+
+    def handle(self, *args, **options):
+        try:
+            batch = Batch.objects.get(id=options['collection_id'])
+            user = get_user_model().objects.get(username=options['username'])
+        except (Batch.DoesNotExist, get_user_model().DoesNotExist) as e:
+            raise CommandError(e)
+
+        # Stored as the list of the submission and streamed in chunks by process_url_submission, the URLs are
+        # validated and deduplicated like the submissions of the API
+        submission = URLSubmission(
+            owner=user,
+            batch=batch,
+            type=options['type'],
+            content_warning=options['content_warning']
+        )
+        if options['file'] == '-':
+            submission.source.save('urls.txt', File(sys.stdin.buffer), save=False)
+        else:
+            with open(options['file'], 'rb') as f:
+                submission.source.save(os.path.basename(options['file']), File(f), save=False)
+        submission.save()
+        process_url_submission(submission.id)
+        submission.refresh_from_db()
+        for error in submission.errors:
+            self.stderr.write(f'Item {error["index"]}: {error["error"]}')
+        if submission.status == URLSubmission.Status.FAILED:
+            raise CommandError(submission.message)
+        self.stdout.write(self.style.SUCCESS(
+            f'{submission.accepted_count} download requests submitted, {submission.duplicate_count} duplicates '
+            f'and {submission.rejected_count} invalid URLs skipped'
+        ))
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from video_downloading_platform.core.indexing import update_search_alias
+
+
+class Command(BaseCommand):
+    help = 'Add the existing collection indexes to the search alias'
+
+    def handle(self, *args, **options):
+        update_search_alias()
+        self.stdout.write(self.style.SUCCESS(f'Collection indexes added to {settings.ELASTICSEARCH_SEARCH_ALIAS}'))
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.13 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import video_downloading_platform.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0043_platformcredentials'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='downloadedcontent',
+            name='thumbnail',
+            field=models.FileField(blank=True, editable=False, max_length=512, null=True, upload_to=video_downloading_platform.core.models._get_thumbnail_upload_dir),
+        ),
+    ]
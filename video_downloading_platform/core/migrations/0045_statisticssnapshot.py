@@ -0,0 +1,57 @@
+# Generated by Django 3.1.13 on 2026-10-18 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+import uuid
+
+
+def create_statistics_schedule(apps, schema_editor):
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.update_or_create(
+        name='update_statistics_snapshot',
+        defaults={
+            'func': 'video_downloading_platform.core.tasks.update_statistics_snapshot',
+            'schedule_type': 'I',
+            'minutes': 10,
+            'repeats': -1,
+            'cluster': settings.TASK_QUEUES['maintenance'],
+        }
+    )
+
+
+def delete_statistics_schedule(apps, schema_editor):
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.filter(name='update_statistics_snapshot').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0044_downloadedcontent_thumbnail'),
+        ('django_q', '0014_schedule_cluster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('full', models.BooleanField(default=False, help_text='Whether the space usage has been recomputed from scratch or updated incrementally.')),
+                ('contents_watermark', models.DateTimeField(help_text='Contents created up to this date are accounted for in the space usage.')),
+                ('collections', models.IntegerField(default=0)),
+                ('requests', models.IntegerField(default=0)),
+                ('requests_succeeded', models.IntegerField(default=0)),
+                ('requests_failed', models.IntegerField(default=0)),
+                ('files', models.IntegerField(default=0)),
+                ('users', models.IntegerField(default=0)),
+                ('used_space', models.BigIntegerField(default=0)),
+                ('failures', models.JSONField(default=list)),
+                ('user_stats', models.JSONField(default=list)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RunPython(create_statistics_schedule, reverse_code=delete_statistics_schedule),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.1.13 on 2026-10-18 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0045_statisticssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageUsage',
+            fields=[
+                ('owner', models.OneToOneField(editable=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='storage_usage', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='batch',
+            name='size_bytes',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Bytes stored for the downloaded contents of the collection.'),
+        ),
+        migrations.AddField(
+            model_name='downloadedcontent',
+            name='size_bytes',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='statisticssnapshot',
+            name='contents_watermark',
+            field=models.DateTimeField(help_text='Contents created up to this date are accounted for in the snapshot.'),
+        ),
+        migrations.AlterField(
+            model_name='statisticssnapshot',
+            name='full',
+            field=models.BooleanField(default=False, help_text='Whether the snapshot is kept as history or pruned after a while.'),
+        ),
+    ]
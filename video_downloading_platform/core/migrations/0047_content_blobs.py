@@ -0,0 +1,30 @@
+# Generated by Django 3.1.13 on 2026-10-18 11:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import video_downloading_platform.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_storage_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentBlob',
+            fields=[
+                ('sha256', models.CharField(editable=False, max_length=64, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content', models.FileField(max_length=512, upload_to=video_downloading_platform.core.models._get_blob_upload_dir)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0, help_text='Number of downloaded contents referencing the blob.')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='downloadedcontent',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='contents', to='core.contentblob'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.1.13 on 2026-10-18 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_enqueued_requests_dispatched(apps, schema_editor):
+    # Requests enqueued before the dispatcher existed are already in the workers queue
+    DownloadRequest = apps.get_model('core', 'DownloadRequest')
+    DownloadRequest.objects.filter(status__in=['ENQUEUED', 'PROCESSING']).update(dispatched_at=F('updated_at'))
+
+
+def create_dispatch_schedule(apps, schema_editor):
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.update_or_create(
+        name='dispatch_download_requests',
+        defaults={
+            'func': 'video_downloading_platform.core.dispatch.dispatch_download_requests',
+            'schedule_type': 'I',
+            'minutes': 1,
+            'repeats': -1,
+            'cluster': settings.TASK_QUEUES['maintenance'],
+        }
+    )
+
+
+def delete_dispatch_schedule(apps, schema_editor):
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.filter(name='dispatch_download_requests').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0047_content_blobs'),
+        ('django_q', '0014_schedule_cluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='downloadrequest',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When the request has been released to the workers, enqueued requests wait for their turn.', null=True),
+        ),
+        migrations.RunPython(mark_enqueued_requests_dispatched, migrations.RunPython.noop),
+        migrations.RunPython(create_dispatch_schedule, delete_dispatch_schedule),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.1.13 on 2026-10-18 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0048_downloadrequest_dispatched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='URLSubmission',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('idempotency_key', models.CharField(blank=True, editable=False, help_text='Key sent by the client, submitting again with the same key returns the same submission.', max_length=255, null=True)),
+                ('status', models.CharField(choices=[('RECEIVED', 'Received'), ('PROCESSING', 'Processing'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed')], default='RECEIVED', max_length=16)),
+                ('type', models.CharField(choices=[('AUTOMATIC', 'Automatic'), ('VIDEO', 'Video'), ('GALLERY', 'Gallery')], default='AUTOMATIC', max_length=16)),
+                ('content_warning', models.TextField(blank=True, help_text='Content warning of the items which do not have their own.', null=True)),
+                ('tags', models.JSONField(blank=True, default=list, help_text='Tags added to every item.')),
+                ('items', models.JSONField(blank=True, help_text='Submitted items, cleared once they have been processed.', null=True)),
+                ('received_count', models.IntegerField(default=0)),
+                ('accepted_count', models.IntegerField(default=0)),
+                ('duplicate_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list, help_text='First rejected items with the reason why.')),
+                ('message', models.TextField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='core.batch')),
+                ('owner', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='downloadrequest',
+            name='submission',
+            field=models.ForeignKey(blank=True, editable=False, help_text='API submission the request comes from.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='download_requests', to='core.urlsubmission'),
+        ),
+        migrations.AddConstraint(
+            model_name='urlsubmission',
+            constraint=models.UniqueConstraint(fields=('owner', 'idempotency_key'), name='unique_submission_idempotency_key'),
+        ),
+    ]
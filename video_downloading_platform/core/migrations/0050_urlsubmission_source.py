@@ -0,0 +1,19 @@
+# Generated by Django 3.1.13 on 2026-10-18 18:44
+
+from django.db import migrations, models
+import video_downloading_platform.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_url_submissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urlsubmission',
+            name='source',
+            field=models.FileField(blank=True, help_text='Uploaded CSV or text list of URLs, deleted once it has been processed.', max_length=512, null=True, upload_to=video_downloading_platform.core.models._get_submission_upload_dir),
+        ),
+    ]
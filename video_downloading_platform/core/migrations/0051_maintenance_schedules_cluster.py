@@ -0,0 +1,29 @@
+# Generated by Django 3.1.13 on 2026-10-18 19:10
+
+from django.conf import settings
+from django.db import migrations
+
+SCHEDULES = ['update_statistics_snapshot', 'dispatch_download_requests']
+
+
+def run_schedules_on_maintenance_cluster(apps, schema_editor):
+    # Schedules without a cluster run on whichever cluster polls first, the interactive one included
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.filter(name__in=SCHEDULES).update(cluster=settings.TASK_QUEUES['maintenance'])
+
+
+def run_schedules_on_any_cluster(apps, schema_editor):
+    Schedule = apps.get_model('django_q', 'Schedule')
+    Schedule.objects.filter(name__in=SCHEDULES).update(cluster=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0050_urlsubmission_source'),
+        ('django_q', '0014_schedule_cluster'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_schedules_on_maintenance_cluster, run_schedules_on_any_cluster),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.13 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_maintenance_schedules_cluster'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='batch',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='Creation date of your collection.'),
+        ),
+        migrations.AlterField(
+            model_name='downloadedcontent',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='Creation date of the current downloaded content.'),
+        ),
+        migrations.AlterField(
+            model_name='downloadrequest',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='Creation date of the current download request.'),
+        ),
+        migrations.AlterField(
+            model_name='statisticssnapshot',
+            name='contents_watermark',
+            field=models.DateTimeField(help_text='Objects created up to this date are accounted for in the snapshot.'),
+        ),
+        migrations.AlterField(
+            model_name='statisticssnapshot',
+            name='full',
+            field=models.BooleanField(default=False, help_text='Whether the snapshot has been recomputed from scratch, full snapshots are kept as history.'),
+        ),
+    ]
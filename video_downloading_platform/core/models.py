@@ -1,5 +1,4 @@
 import logging
-import tempfile
 import uuid
 import os
 import re
@@ -7,23 +6,23 @@ from datetime import timedelta
 import string
 import random
 
-import yt_dlp as youtube_dl
 from django.conf import settings
 from django.core.validators import URLValidator
-from django.db import models
-from django.db.models.signals import pre_delete
+from django.db import models, transaction
+from django.db.models import Count, DEFERRED
+from django.db.models.signals import pre_delete, post_init, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_q.humanhash import HumanHasher
 from django_q.models import Schedule
-from django_q.tasks import async_task, schedule
+from django_q.tasks import schedule
 from elasticsearch_dsl import Index
-from gallery_dl.extractor import find as gdl_find_extractors
 from taggit.managers import TaggableManager
 from taggit.models import GenericUUIDTaggedItemBase, TaggedItemBase
 
+from video_downloading_platform.core.queues import INTERACTIVE, enqueue
 from video_downloading_platform.core.utils import transform_hl_results
 
 logger = logging.getLogger(__name__)
@@ -101,6 +100,7 @@ class Batch(models.Model):
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         help_text=_('Creation date of your collection.'),
         editable=False
     )
@@ -145,6 +145,11 @@ class Batch(models.Model):
         null=True,
         related_name='batch'
     )
+    size_bytes = models.BigIntegerField(
+        default=0,
+        help_text=_('Bytes stored for the downloaded contents of the collection.'),
+        editable=False
+    )
 
     def close(self):
         self.status = Batch.CLOSED
@@ -161,98 +166,34 @@ class Batch(models.Model):
                 if report.archive:
                     report.archive.delete()
                 for downloaded_content in report.downloadedcontent_set.all():
-                    if downloaded_content.content:
-                        downloaded_content.content.delete()
+                    downloaded_content.release_content()
         self.save()
 
-    def start(self):
-        for download_request in self.download_requests.filter(status=DownloadRequest.Status.CREATED):
-            download_request.start()
-
-    def start_and_close(self):
-        self.start()
-        self.close()
-
     def get_es_index(self):
         return f'c.{self.es_index}'
 
-    @property
-    def indexed_data(self):
-        query = {
-            "query": {
-                "query_string": {
-                    "query": "*"
-                }
-            },
-            "_source": [
-                "collection_id", "collection_name", "created_at", "mimetype", "origin", "owner", "platform",
-                "post.description", "post.title", "post.upload_date", "post.uploader", "sha256", "stats.comment_count",
-                "stats.like_count", "stats.view_count", "status", "tags", "thumbnail_content_id", "type", "is_hidden",
-                "request_id"
-            ],
-            "sort": {"created_at": "desc"},
-            "size": 10000,
-        }
-        from elasticsearch import Elasticsearch
-        es = Elasticsearch(settings.ELASTICSEARCH_HOSTS)
-        try:
-            print(query)
-            raw_results = es.search(index=self.get_es_index(), body=query)
-            results = transform_hl_results(raw_results)
-            return results
-        except Exception as e:
-            logger.exception(e)
-            return []
-
     @property
     def failed_download_requests(self):
         return self.download_requests.exclude(status=DownloadRequest.Status.SUCCEEDED)
 
     @staticmethod
     def get_users_batches(user):
-        try:
-            user_groups = user.groups.values_list('name', flat=True)
-            if 'admin' in user_groups:
-                return Batch.objects.all()
-            else:
-                open_batches = []
-                teams = BatchTeam.get_my_teams_as_contrib(user).all()
-                for team in teams:
-                    batch = team.batch.first()
-                    open_batches.append(batch)
-                open_batches.extend(Batch.objects.filter(owner=user).all())
-                return open_batches
-        except Exception as e:
-            print(e)
-        return None
+        from video_downloading_platform.core.visibility import get_visible_batches
+        return get_visible_batches(user)
 
     @staticmethod
-    def get_users_batch_es_indexes(user):
-        try:
-            user_groups = user.groups.values_list('name', flat=True)
-            if 'admin' in user_groups:
-                return ['c.*']
-            else:
-                # limit to the 100 first batches to prevent exceeding ES URL max length
-                # since indexes are passed in the URL during the query
-                open_batches = Batch.get_users_open_batches(user)[:100]
-                return [
-                    b.get_es_index() for b in open_batches if b.indexed
-                ]
-        except Exception as e:
-            print(e)
-        return []
+    def get_users_searchable_collection_ids(user):
+        """
+        IDs of the collections the user can search, None when they can search all of them.
+        """
+        from video_downloading_platform.core.visibility import is_admin, get_visible_batch_ids
+        if is_admin(user):
+            return None
+        return get_visible_batch_ids(user).get(Batch.OPEN, set())
 
     @staticmethod
     def get_users_open_batches(user):
-        _batches = []
-        teams = BatchTeam.get_my_teams_as_contrib(user).all()
-        for team in teams:
-            batch = team.batch.first()
-            if batch:
-                _batches.append(batch.id)
-        _batches.extend([b.id for b in Batch._get_users_batches(user, Batch.OPEN).all()])
-        return Batch.objects.filter(id__in=_batches)
+        return Batch._get_users_batches(user, Batch.OPEN)
 
     @staticmethod
     def get_users_closed_batches(user):
@@ -267,23 +208,8 @@ class Batch(models.Model):
 
     @staticmethod
     def _get_users_batches(user, status):
-        try:
-            user_groups = user.groups.values_list('name', flat=True)
-            if 'admin' in user_groups:
-                return Batch.objects.filter(status=status)
-            else:
-                _batches = []
-                teams = BatchTeam.get_my_teams_as_contrib(user).all()
-                for team in teams:
-                    batch = team.batch.first()
-                    if batch and batch.status == status:
-                        _batches.append(batch.id)
-                _batches.extend([b.id for b in Batch.objects.filter(owner=user, status=status).all()])
-                _batches = list(set(_batches))
-                return Batch.objects.filter(id__in=_batches)
-        except Exception as e:
-            print(e)
-        return None
+        from video_downloading_platform.core.visibility import get_visible_batches
+        return get_visible_batches(user, status)
 
     @property
     def status_class(self):
@@ -337,6 +263,7 @@ class DownloadRequest(models.Model):
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         help_text=_('Creation date of the current download request.'),
         editable=False
     )
@@ -376,11 +303,27 @@ class DownloadRequest(models.Model):
     is_hidden = models.BooleanField(
         default=False
     )
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text=_('When the request has been released to the workers, enqueued requests wait for their turn.'),
+        editable=False
+    )
     content_warning = models.TextField(
         help_text=_('Add a content warning.'),
         null=True,
         blank=True
     )
+    submission = models.ForeignKey(
+        'URLSubmission',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='download_requests',
+        help_text=_('API submission the request comes from.'),
+        editable=False
+    )
     tags = TaggableManager(through=UUIDTaggedItem, blank=True)
 
     def get_es_index(self):
@@ -413,24 +356,28 @@ class DownloadRequest(models.Model):
             logger.exception(e)
             return []
 
-    def start(self):
-        from video_downloading_platform.core.tasks import run_download_video_request, run_download_gallery_request, run_download_from_telegram
-        self.status = DownloadRequest.Status.ENQUEUED
-        self.save()
+    def release(self, queue=None, broker=None):
+        from video_downloading_platform.core.tasks import run_download_video_request, run_download_gallery_request, \
+            run_download_from_telegram, run_download_automatic_request
+        queue = queue or INTERACTIVE
+        hook = 'video_downloading_platform.core.dispatch.on_download_finished'
 
         match = re.match(r"^https:\/\/t\.me\/(?P<user_id>.*?)\/(?P<post_id>[0-9]+)", self.url, re.IGNORECASE)
 
         if match:
             s_id = str(self.id)
-            async_task(run_download_from_telegram, s_id)
+            enqueue(queue, run_download_from_telegram, s_id, broker=broker, hook=hook)
         elif self.type == DownloadRequest.VIDEO:
             # run_download_video_request(self.id)
             s_id = str(self.id)
-            async_task(run_download_video_request, s_id)
+            enqueue(queue, run_download_video_request, s_id, broker=broker, hook=hook)
         elif self.type == DownloadRequest.GALLERY:
             # run_download_gallery_request(self.id)
             s_id = str(self.id)
-            async_task(run_download_gallery_request, s_id)
+            enqueue(queue, run_download_gallery_request, s_id, broker=broker, hook=hook)
+        elif self.type == DownloadRequest.AUTOMATIC:
+            s_id = str(self.id)
+            enqueue(queue, run_download_automatic_request, s_id, broker=broker, hook=hook)
 
     @staticmethod
     def get_users_requests(user):
@@ -440,59 +387,140 @@ class DownloadRequest(models.Model):
             print(e)
         return None
 
+    @staticmethod
+    def get_batches_status_counters(batch_ids):
+        """
+        Count the submitted, succeeded and failed requests of each of the given batches with a single grouped query.
+        """
+        counters = {batch_id: {'submitted': 0, 'succeeded': 0, 'failed': 0} for batch_id in batch_ids}
+        rows = DownloadRequest.objects.filter(batch_id__in=batch_ids) \
+            .values('batch_id', 'status') \
+            .annotate(count=Count('id')) \
+            .order_by()
+        for row in rows:
+            counter = _STATUS_COUNTERS.get(row['status'])
+            if counter:
+                counters[row['batch_id']][counter] += row['count']
+        return counters
+
     def __str__(self):
         return f'{self.owner} - {self.url}'
 
 
-def _get_zip_upload_dir(instance, filename):
-    owner_id = instance.owner.id
-    download_request_id = instance.download_request.id
-    return f'{owner_id}/{download_request_id}/{instance.id}.archive.zip'
+_STATUS_COUNTERS = {
+    DownloadRequest.Status.CREATED: 'submitted',
+    DownloadRequest.Status.ENQUEUED: 'submitted',
+    DownloadRequest.Status.PROCESSING: 'submitted',
+    DownloadRequest.Status.POST_PROCESSING: 'submitted',
+    DownloadRequest.Status.SUCCEEDED: 'succeeded',
+    DownloadRequest.Status.CANCELLED: 'failed',
+    DownloadRequest.Status.FAILED: 'failed',
+}
 
 
-def _get_request_types_to_run(url, request_type):
-    suitable_for_ydl = False
-    suitable_for_gdl = False
-    suitable_for_tdl = False
-    if request_type == DownloadRequest.AUTOMATIC:
-        # Suitable for Youtube DL?
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            options = {
-                'outtmpl': f'{tmp_dir}/%(id)s.%(ext)s',
-                'format': 'best'
-            }
-            try:
-                with youtube_dl.YoutubeDL(options) as ydl:
-                    ydl.extract_info(url, download=False, process=False)
-                    suitable_for_ydl = True
-            except Exception:
-                suitable_for_ydl = False
+def _get_submission_upload_dir(instance, filename):
+    owner_id = instance.owner.id
+    return f'{owner_id}/submissions/{instance.id}/{os.path.basename(filename)}'
 
-        # Suitable for Gallery DL?
-        suitable_for_gdl = gdl_find_extractors(url) is not None
 
-        # Suitable for Telegram downloader
-        match = re.match(r"^https:\/\/t\.me\/(?P<user_id>.*?)\/(?P<post_id>[0-9]+)", url, re.IGNORECASE)
-        suitable_for_tdl = bool(match)
-    elif request_type == DownloadRequest.VIDEO:
-        suitable_for_ydl = True
-    elif request_type == DownloadRequest.GALLERY:
-        suitable_for_gdl = True
+class URLSubmission(models.Model):
+    """
+    URLs submitted for a collection, either as items through the API or as an uploaded list. They are validated and
+    turned into download requests in the background, the counters track what became of them.
+    """
 
-    request_types = []
-    if suitable_for_ydl:
-        request_types.append(DownloadRequest.VIDEO)
-    if suitable_for_gdl:
-        request_types.append(DownloadRequest.GALLERY)
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'idempotency_key'], name='unique_submission_idempotency_key'),
+        ]
 
-    if suitable_for_tdl:
-        request_types = [DownloadRequest.VIDEO]
+    class Status(models.TextChoices):
+        RECEIVED = 'RECEIVED', _('Received')
+        PROCESSING = 'PROCESSING', _('Processing')
+        SUCCEEDED = 'SUCCEEDED', _('Succeeded')
+        FAILED = 'FAILED', _('Failed')
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        editable=False
+    )
+    batch = models.ForeignKey(
+        Batch,
+        on_delete=models.CASCADE,
+        related_name='submissions'
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text=_('Key sent by the client, submitting again with the same key returns the same submission.'),
+        editable=False
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.RECEIVED,
+    )
+    type = models.CharField(
+        max_length=16,
+        choices=DownloadRequest.REQUEST_TYPE,
+        default=DownloadRequest.AUTOMATIC
+    )
+    content_warning = models.TextField(
+        help_text=_('Content warning of the items which do not have their own.'),
+        null=True,
+        blank=True
+    )
+    tags = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('Tags added to every item.')
+    )
+    items = models.JSONField(
+        null=True,
+        blank=True,
+        help_text=_('Submitted items, cleared once they have been processed.')
+    )
+    source = models.FileField(
+        upload_to=_get_submission_upload_dir,
+        max_length=512,
+        null=True,
+        blank=True,
+        help_text=_('Uploaded CSV or text list of URLs, deleted once it has been processed.')
+    )
+    received_count = models.IntegerField(default=0)
+    accepted_count = models.IntegerField(default=0)
+    duplicate_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    errors = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('First rejected items with the reason why.')
+    )
+    message = models.TextField(
+        null=True,
+        blank=True
+    )
 
-    if not suitable_for_ydl and not suitable_for_gdl and not suitable_for_tdl:
-        request_types.append(DownloadRequest.VIDEO)
-        request_types.append(DownloadRequest.GALLERY)
 
-    return request_types
+def _get_zip_upload_dir(instance, filename):
+    owner_id = instance.owner.id
+    download_request_id = instance.download_request.id
+    return f'{owner_id}/{download_request_id}/{instance.id}.archive.zip'
 
 
 class BatchRequest(models.Model):
@@ -572,7 +600,7 @@ class DownloadReport(models.Model):
         try:
             content = self.downloadedcontent_set.filter(mime_type__in=['image/jpeg', 'image/png', 'image/webp']).first()
             if content:
-                url = reverse_lazy("get_downloaded_file", kwargs={'content_id': content.id})
+                url = reverse_lazy("get_downloaded_content_thumbnail", kwargs={'content_id': content.id})
                 return url
         except Exception as e:
             print(e)
@@ -611,6 +639,44 @@ def _get_upload_dir(instance, filename):
     return f'{owner_id}/{download_request_id}/{instance.id}'
 
 
+def _get_thumbnail_upload_dir(instance, filename):
+    return f'{_get_upload_dir(instance, filename)}.thumbnail.jpg'
+
+
+def _get_blob_upload_dir(instance, filename):
+    return f'blobs/{instance.sha256[:2]}/{instance.sha256}'
+
+
+class ContentBlob(models.Model):
+    """
+    Stored file shared by all the downloaded contents having the same SHA256, addressed by its hash. It is only
+    uploaded once and deleted when the last downloaded content referencing it is deleted.
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        primary_key=True,
+        editable=False
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        editable=False
+    )
+    content = models.FileField(
+        upload_to=_get_blob_upload_dir,
+        max_length=512
+    )
+    size_bytes = models.BigIntegerField(
+        default=0
+    )
+    ref_count = models.IntegerField(
+        default=0,
+        help_text=_('Number of downloaded contents referencing the blob.')
+    )
+
+    def __str__(self):
+        return self.sha256
+
+
 class DownloadedContent(models.Model):
     class Meta:
         ordering = ['name']
@@ -623,6 +689,7 @@ class DownloadedContent(models.Model):
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         help_text=_('Creation date of the current downloaded content.'),
         editable=False
     )
@@ -648,6 +715,11 @@ class DownloadedContent(models.Model):
         blank=True,
         null=True
     )
+    size_bytes = models.BigIntegerField(
+        blank=True,
+        null=True,
+        editable=False
+    )
     name = models.CharField(
         max_length=512,
     )
@@ -657,6 +729,21 @@ class DownloadedContent(models.Model):
         null=True,
         blank=True
     )
+    blob = models.ForeignKey(
+        ContentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='contents',
+        editable=False
+    )
+    thumbnail = models.FileField(
+        upload_to=_get_thumbnail_upload_dir,
+        max_length=512,
+        null=True,
+        blank=True,
+        editable=False
+    )
     metadata = models.JSONField(
         null=True,
         blank=True
@@ -687,32 +774,61 @@ class DownloadedContent(models.Model):
         editable=False
     )
 
+    def release_content(self):
+        """
+        Delete the stored file while keeping the downloaded content, a shared blob is only deleted with its last
+        reference.
+        """
+        blob_id = self.blob_id
+        self.size_bytes = 0
+        if blob_id:
+            self.blob = None
+            self.content = None
+            self.save()
+            from video_downloading_platform.core.blobs import release_blob
+            release_blob(blob_id)
+        elif self.content:
+            self.content.delete()
+
     @property
     def indexed_data(self):
-        query = {
-            "query": {
-                "query_string": {
-                    "query": f'content_id: "{self.id}"'
-                }
-            },
-            "_source": [
-                "collection_id", "collection_name", "created_at", "mimetype", "origin", "owner", "platform",
-                "post.description", "post.title", "post.upload_date", "post.uploader", "sha256", "stats.comment_count",
-                "stats.like_count", "stats.view_count", "status", "tags", "thumbnail_content_id", "type", "is_hidden",
-                "request_id"
-            ],
-            "sort": {"created_at": "desc"},
-            "size": 10000,
-        }
-        from elasticsearch import Elasticsearch
-        es = Elasticsearch(settings.ELASTICSEARCH_HOSTS)
-        try:
-            raw_results = es.search(index='c.*', body=query)
-            results = transform_hl_results(raw_results)
-            return results
-        except Exception as e:
-            logger.exception(e)
-            return []
+        if not hasattr(self, '_indexed_data'):
+            DownloadedContent.fetch_indexed_data([self])
+        return self._indexed_data
+
+    @staticmethod
+    def fetch_indexed_data(contents):
+        """
+        Get the indexed documents of the given contents by ID from the index of their collection, with a single
+        request per collection. The documents are then available through `indexed_data`.
+        """
+        from video_downloading_platform.core.indexing import get_es_connection
+        contents_per_index = {}
+        for content in contents:
+            content._indexed_data = []
+            index_name = content.download_report.download_request.get_es_index()
+            contents_per_index.setdefault(index_name, []).append(content)
+        es = get_es_connection()
+        for index_name, index_contents in contents_per_index.items():
+            try:
+                response = es.mget(
+                    index=index_name,
+                    body={'ids': [str(content.id) for content in index_contents]},
+                    _source_includes=[
+                        "collection_id", "collection_name", "created_at", "mimetype", "origin", "owner", "platform",
+                        "post.description", "post.title", "post.upload_date", "post.uploader", "sha256",
+                        "stats.comment_count", "stats.like_count", "stats.view_count", "status", "tags",
+                        "thumbnail_content_id", "type", "is_hidden", "request_id"
+                    ]
+                )
+            except Exception as e:
+                logger.exception(e)
+                continue
+            documents = {doc['_id']: doc for doc in response['docs'] if doc.get('found')}
+            for content in index_contents:
+                document = documents.get(str(content.id))
+                if document:
+                    content._indexed_data = transform_hl_results({'hits': {'hits': [document]}})
 
     @staticmethod
     def get_users_downloaded_content(user):
@@ -793,6 +909,70 @@ class PlatformCredentials(models.Model):
         blank=True
     )
 
+
+class StatisticsSnapshot(models.Model):
+    """
+    Platform statistics computed in the background by `update_statistics_snapshot`. Snapshots are updated
+    incrementally and recomputed from scratch once in a while, the full ones are kept forever as history to chart
+    trends while the ones in between are pruned.
+    """
+
+    class Meta:
+        ordering = ['-created_at']
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        editable=False
+    )
+    full = models.BooleanField(
+        default=False,
+        help_text=_('Whether the snapshot has been recomputed from scratch, full snapshots are kept as history.')
+    )
+    contents_watermark = models.DateTimeField(
+        help_text=_('Objects created up to this date are accounted for in the snapshot.'),
+    )
+    collections = models.IntegerField(default=0)
+    requests = models.IntegerField(default=0)
+    requests_succeeded = models.IntegerField(default=0)
+    requests_failed = models.IntegerField(default=0)
+    files = models.IntegerField(default=0)
+    users = models.IntegerField(default=0)
+    used_space = models.BigIntegerField(default=0)
+    failures = models.JSONField(default=list)
+    user_stats = models.JSONField(default=list)
+
+    @property
+    def requests_percent(self):
+        if not self.requests:
+            return 0
+        return 100 * self.requests_succeeded / (1.0 * self.requests)
+
+
+class StorageUsage(models.Model):
+    """
+    Running total of the bytes stored for a user, updated whenever a downloaded content is saved or deleted.
+    """
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='storage_usage',
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
+    size_bytes = models.BigIntegerField(
+        default=0
+    )
+
+
 def cleanup_upload_request(request_id):
     try:
         upload_request = UploadRequest.objects.get(id=request_id)
@@ -805,11 +985,23 @@ def cleanup_upload_request(request_id):
 def delete_downloaded_content_stored_files(sender, instance: DownloadedContent, using, **kwargs):
     print(f'Delete downloaded content [{instance.owner}] {instance.id}')
     try:
-        instance.content.delete()
+        # Shared blobs are released once the downloaded content is deleted
+        if not instance.blob_id:
+            instance.content.delete()
+        if instance.thumbnail:
+            instance.thumbnail.delete()
     except Exception as e:
         logger.error(e)
 
 
+@receiver(post_delete, sender=DownloadedContent, dispatch_uid='release_content_blob')
+def release_downloaded_content_blob(sender, instance: DownloadedContent, **kwargs):
+    if not instance.blob_id:
+        return
+    from video_downloading_platform.core.blobs import release_blob
+    release_blob(instance.blob_id)
+
+
 @receiver(pre_delete, sender=DownloadReport, dispatch_uid='delete_stored_archive_file')
 def delete_download_report_stored_files(sender, instance: DownloadReport, using, **kwargs):
     print(f'Delete the archive [{instance.owner}] {instance.id}')
@@ -832,6 +1024,87 @@ def delete_download_request(sender, instance: DownloadRequest, using, **kwargs):
     except Exception as e:
         logger.error(e)
 
+
+# Fields a batch's visibility depends on
+_VISIBILITY_FIELDS = ('owner_id', 'team_id', 'status')
+
+
+@receiver(post_init, sender=Batch, dispatch_uid='track_batch_visibility_fields')
+def track_batch_visibility_fields(sender, instance: Batch, **kwargs):
+    # Read from __dict__ so that deferred fields are not fetched
+    instance._loaded_visibility = tuple(instance.__dict__.get(field, DEFERRED) for field in _VISIBILITY_FIELDS)
+
+
+@receiver(post_save, sender=Batch, dispatch_uid='invalidate_visibility_on_batch_save')
+def invalidate_visibility_on_batch_save(sender, instance: Batch, created, **kwargs):
+    visibility = tuple(instance.__dict__.get(field, DEFERRED) for field in _VISIBILITY_FIELDS)
+    if not created and visibility == instance._loaded_visibility:
+        return
+    instance._loaded_visibility = visibility
+    from video_downloading_platform.core.visibility import invalidate_visibility
+    invalidate_visibility()
+
+
+@receiver(post_delete, sender=Batch, dispatch_uid='invalidate_visibility_on_batch_delete')
+@receiver(m2m_changed, sender=BatchTeam.contributors.through, dispatch_uid='invalidate_visibility_on_team_change')
+def invalidate_batch_visibility(sender, **kwargs):
+    action = kwargs.get('action')
+    if action and not action.startswith('post_'):
+        return
+    from video_downloading_platform.core.visibility import invalidate_visibility
+    invalidate_visibility()
+
+
+@receiver(post_init, sender=DownloadRequest, dispatch_uid='track_download_request_status')
+def track_download_request_status(sender, instance: DownloadRequest, **kwargs):
+    # Read from __dict__ so that a deferred status is not fetched
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=DownloadRequest, dispatch_uid='publish_download_request_status')
+def publish_download_request_status(sender, instance: DownloadRequest, created, **kwargs):
+    if not created and instance.status == instance._loaded_status:
+        return
+    instance._loaded_status = instance.status
+    from video_downloading_platform.core.events import publish_request_status
+    transaction.on_commit(lambda: publish_request_status(instance))
+
+
+@receiver(post_init, sender=DownloadedContent, dispatch_uid='track_downloaded_content_size')
+def track_downloaded_content_size(sender, instance: DownloadedContent, **kwargs):
+    # Read from __dict__ so that a deferred size is not fetched, its previous value is then unknown
+    instance._loaded_size_bytes = instance.__dict__.get('size_bytes', DEFERRED)
+
+
+@receiver(post_save, sender=DownloadedContent, dispatch_uid='account_downloaded_content_size')
+def account_downloaded_content_size(sender, instance: DownloadedContent, created, **kwargs):
+    if instance._loaded_size_bytes is DEFERRED or 'size_bytes' not in instance.__dict__:
+        return
+    previous = 0 if created else (instance._loaded_size_bytes or 0)
+    delta = (instance.size_bytes or 0) - previous
+    instance._loaded_size_bytes = instance.size_bytes
+    from video_downloading_platform.core.quotas import update_storage_usage
+    update_storage_usage(instance.owner_id, instance.download_report_id, delta)
+
+
+@receiver(post_delete, sender=DownloadedContent, dispatch_uid='release_downloaded_content_size')
+def release_downloaded_content_size(sender, instance: DownloadedContent, **kwargs):
+    if instance._loaded_size_bytes is DEFERRED:
+        return
+    from video_downloading_platform.core.quotas import update_storage_usage
+    update_storage_usage(instance.owner_id, instance.download_report_id, -(instance._loaded_size_bytes or 0))
+
+
 @receiver(pre_delete, sender=UploadRequest, dispatch_uid='delete_upload_request_file')
 def delete_upload_request_stored_files(sender, instance: UploadRequest, using, **kwargs):
     instance.cleanup()
+
+
+@receiver(pre_delete, sender=URLSubmission, dispatch_uid='delete_submission_source_file')
+def delete_url_submission_stored_files(sender, instance: URLSubmission, using, **kwargs):
+    if not instance.source:
+        return
+    try:
+        instance.source.delete(save=False)
+    except Exception as e:
+        logger.error(e)
@@ -0,0 +1,151 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import yt_dlp as youtube_dl
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from gallery_dl.extractor import find as gdl_find_extractors
+from yt_dlp.extractor import gen_extractor_classes
+
+from video_downloading_platform.core.events import publish_batch_statuses
+from video_downloading_platform.core.models import DownloadRequest
+from video_downloading_platform.core.tagging import bulk_tag, get_tag_names
+
+TELEGRAM_URL = re.compile(r"^https:\/\/t\.me\/(?P<user_id>.*?)\/(?P<post_id>[0-9]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _get_ydl_extractors():
+    # The generic extractor matches any URL, whether it finds a video can only be known by probing
+    return [ie for ie in gen_extractor_classes() if ie.ie_key() != 'Generic']
+
+
+def _find_ydl_extractor(url):
+    for ie in _get_ydl_extractors():
+        if ie.suitable(url):
+            return ie
+    return None
+
+
+def _get_domain(url):
+    return urlparse(url).netloc.lower()
+
+
+def _probe_with_ydl(url):
+    """
+    Whether yt-dlp can extract something from the given URL, this requires a network round-trip.
+    """
+    options = {
+        'quiet': True,
+        'socket_timeout': settings.URL_PROBE_TIMEOUT,
+    }
+    try:
+        with youtube_dl.YoutubeDL(options) as ydl:
+            ydl.extract_info(url, download=False, process=False)
+            return True
+    except Exception:
+        return False
+
+
+def _get_request_types(suitable_for_ydl, suitable_for_gdl):
+    request_types = []
+    if suitable_for_ydl:
+        request_types.append(DownloadRequest.VIDEO)
+    if suitable_for_gdl:
+        request_types.append(DownloadRequest.GALLERY)
+    if not request_types:
+        # Both downloaders are tried in turn by a single request
+        request_types = [DownloadRequest.AUTOMATIC]
+    return request_types
+
+
+def get_request_types_to_run(urls):
+    """
+    Map each URL to the types of download requests to run for it in automatic mode. The decision comes from the
+    URL patterns of the yt-dlp and gallery-dl extractors when a specific extractor matches. The other URLs are
+    probed with yt-dlp, once per domain and concurrently, and the result is cached per domain. A positive probe
+    does not tell whether the other pages of the domain have a video, those run in automatic mode so that
+    gallery-dl is tried when yt-dlp finds nothing.
+    """
+    request_types = {}
+    to_probe = {}
+    for url in urls:
+        if TELEGRAM_URL.match(url):
+            request_types[url] = [DownloadRequest.VIDEO]
+            continue
+        suitable_for_gdl = gdl_find_extractors(url) is not None
+        if _find_ydl_extractor(url):
+            request_types[url] = _get_request_types(True, suitable_for_gdl)
+            continue
+        to_probe.setdefault(_get_domain(url), []).append((url, suitable_for_gdl))
+
+    cache_keys = {domain: f'url_probe:{domain}' for domain in to_probe}
+    cached = cache.get_many(cache_keys.values())
+    probed = {domain: cached[key] for domain, key in cache_keys.items() if key in cached}
+    domains = [domain for domain in to_probe if domain not in probed]
+    probed_urls = {}
+    if domains:
+        with ThreadPoolExecutor(max_workers=settings.URL_PROBE_CONCURRENCY) as executor:
+            urls_to_probe = [to_probe[domain][0][0] for domain in domains]
+            results = executor.map(_probe_with_ydl, urls_to_probe)
+            for domain, url, result in zip(domains, urls_to_probe, results):
+                probed[domain] = result
+                probed_urls[url] = result
+        cache.set_many({cache_keys[domain]: probed[domain] for domain in domains}, settings.URL_PROBE_CACHE_TTL)
+
+    for domain, entries in to_probe.items():
+        for url, suitable_for_gdl in entries:
+            if url in probed_urls:
+                request_types[url] = _get_request_types(probed_urls[url], suitable_for_gdl)
+            elif probed[domain]:
+                request_types[url] = [DownloadRequest.AUTOMATIC]
+            else:
+                request_types[url] = _get_request_types(False, suitable_for_gdl)
+    return request_types
+
+
+def resolve_automatic_requests(request_ids):
+    """
+    Give their actual type to the given automatic download requests and enqueue them, a request is duplicated when
+    several downloaders are suitable for its URL. The requests no downloader is known to be suitable for keep the
+    automatic type.
+    """
+    download_requests = list(
+        DownloadRequest.objects.filter(
+            id__in=request_ids, type=DownloadRequest.AUTOMATIC, status=DownloadRequest.Status.CREATED
+        )
+    )
+    request_types = get_request_types_to_run({download_request.url for download_request in download_requests})
+    ids_per_type = {}
+    duplicates = []
+    for download_request in download_requests:
+        first_type, *other_types = request_types[download_request.url]
+        ids_per_type.setdefault(first_type, []).append(download_request.id)
+        for request_type in other_types:
+            duplicates.append((download_request.id, DownloadRequest(
+                batch_id=download_request.batch_id,
+                url=download_request.url,
+                owner_id=download_request.owner_id,
+                type=request_type,
+                status=DownloadRequest.Status.ENQUEUED,
+                content_warning=download_request.content_warning,
+                submission_id=download_request.submission_id
+            )))
+    with transaction.atomic():
+        for request_type, ids in ids_per_type.items():
+            DownloadRequest.objects.filter(id__in=ids).update(
+                type=request_type, status=DownloadRequest.Status.ENQUEUED, dispatched_at=None
+            )
+        DownloadRequest.objects.bulk_create(
+            [duplicate for _, duplicate in duplicates], batch_size=settings.SUBMISSION_BATCH_SIZE
+        )
+        # The duplicates carry the tags of their original request
+        tag_names = get_tag_names(DownloadRequest, [request_id for request_id, _ in duplicates])
+        bulk_tag(DownloadRequest, {
+            duplicate.id: tag_names[request_id] for request_id, duplicate in duplicates if request_id in tag_names
+        })
+        batch_ids = {download_request.batch_id for download_request in download_requests}
+        transaction.on_commit(lambda: publish_batch_statuses(batch_ids))
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django_q.brokers import get_broker
+from django_q.tasks import async_task
+
+# Uploads and users with few pending downloads, someone is waiting for them
+INTERACTIVE = 'interactive'
+# Users with many pending downloads, they use whatever capacity is left
+BULK = 'bulk'
+# Indexing, deletions and statistics
+MAINTENANCE = 'maintenance'
+
+_brokers = {}
+
+
+def get_queue_broker(queue):
+    """
+    Broker of the django-q cluster serving the given queue, see TASK_QUEUES.
+    """
+    name = settings.TASK_QUEUES[queue]
+    if name not in _brokers:
+        _brokers[name] = get_broker(name)
+    return _brokers[name]
+
+
+def get_submission_queue(pending_count):
+    """
+    Queue of the download requests of a user with `pending_count` requests waiting to be downloaded.
+    """
+    return BULK if pending_count > settings.TASK_BULK_THRESHOLD else INTERACTIVE
+
+
+@contextmanager
+def pipelined_broker(queue):
+    """
+    Broker of the given queue buffering the tasks queued with it, they are pushed in a single round-trip to Redis
+    when the block exits.
+    """
+    broker = get_queue_broker(queue)
+    if not hasattr(broker.connection, 'pipeline'):
+        yield broker
+        return
+    # Not copy.copy(), the brokers reconnect when unpickled
+    pipelined = object.__new__(type(broker))
+    pipelined.__dict__.update(broker.__dict__, connection=broker.connection.pipeline(transaction=False))
+    yield pipelined
+    pipelined.connection.execute()
+
+
+def enqueue(queue, func, *args, broker=None, **kwargs):
+    """
+    Queue a task for the worker pool of the given queue, through `broker` if given, see pipelined_broker.
+    """
+    return async_task(func, *args, broker=broker or get_queue_broker(queue), **kwargs)
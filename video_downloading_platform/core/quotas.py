@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import filesizeformat
+from django.utils.translation import gettext as _
+
+from video_downloading_platform.core.models import Batch, DownloadRequest, DownloadedContent, StorageUsage
+
+
+def update_storage_usage(owner_id, download_report_id, delta):
+    """
+    Add `delta` bytes to the running totals of the owner and of the collection of the given download report.
+    """
+    if not delta:
+        return
+    batch_id = DownloadRequest.objects.filter(report__id=download_report_id).values_list('batch_id', flat=True).first()
+    if batch_id:
+        Batch.objects.filter(id=batch_id).update(size_bytes=F('size_bytes') + delta)
+    if StorageUsage.objects.filter(owner_id=owner_id).update(size_bytes=F('size_bytes') + delta):
+        return
+    _, created = StorageUsage.objects.get_or_create(owner_id=owner_id, defaults={'size_bytes': max(delta, 0)})
+    if not created:
+        StorageUsage.objects.filter(owner_id=owner_id).update(size_bytes=F('size_bytes') + delta)
+
+
+def recompute_storage_usage():
+    """
+    Recompute the running totals of every user and collection from the sizes of the downloaded contents.
+    """
+    batch_sizes = DownloadedContent.objects \
+        .filter(download_report__download_request__batch=OuterRef('pk')) \
+        .order_by() \
+        .values('download_report__download_request__batch') \
+        .annotate(total=Sum('size_bytes')) \
+        .values('total')
+    Batch.objects.update(size_bytes=Coalesce(Subquery(batch_sizes), Value(0)))
+
+    owner_sizes = DownloadedContent.objects.order_by().values('owner_id').annotate(total=Sum('size_bytes'))
+    StorageUsage.objects.all().delete()
+    StorageUsage.objects.bulk_create([
+        StorageUsage(owner_id=row['owner_id'], size_bytes=row['total'] or 0) for row in owner_sizes
+    ])
+
+
+def get_user_usage(user):
+    return StorageUsage.objects.filter(owner=user).values_list('size_bytes', flat=True).first() or 0
+
+
+def _exceeds(usage, size, quota):
+    return quota and (usage >= quota or usage + size > quota)
+
+
+def check_storage_quota(user, batch=None, size=0):
+    """
+    Raise a ValidationError if storing `size` more bytes for the user, in the given collection if any, would exceed
+    the quotas. The size of a download is not known in advance, new downloads are refused once a quota is reached.
+    A quota of 0 means unlimited.
+    """
+    user_quota = settings.STORAGE_QUOTA_PER_USER
+    if _exceeds(get_user_usage(user), size, user_quota):
+        raise ValidationError(
+            _('Your storage quota of %(quota)s is exhausted.') % {'quota': filesizeformat(user_quota)}
+        )
+    batch_quota = settings.STORAGE_QUOTA_PER_COLLECTION
+    if batch and _exceeds(batch.size_bytes, size, batch_quota):
+        raise ValidationError(
+            _('The storage quota of %(quota)s of this collection is exhausted.') % {
+                'quota': filesizeformat(batch_quota)
+            }
+        )
@@ -0,0 +1,161 @@
+import base64
+import json
+
+from django.conf import settings
+
+from video_downloading_platform.core.indexing import get_es_connection
+from video_downloading_platform.core.utils import transform_hl_results
+
+SOURCE_FIELDS = [
+    "collection_id", "collection_name", "created_at", "mimetype", "origin", "owner", "platform",
+    "post.description", "post.title", "post.upload_date", "post.uploader", "sha256", "stats.comment_count",
+    "stats.like_count", "stats.view_count", "status", "tags", "thumbnail_content_id", "type", "is_hidden",
+    "request_id"
+]
+# Only the fields displayed with the results are highlighted
+HIGHLIGHTED_FIELDS = [
+    "post.title", "post.description", "post.uploader", "origin", "collection_name", "tags", "owner", "exif"
+]
+# Stable order for search_after, the content ID breaks ties between contents downloaded at the same time
+SORT = [
+    {"created_at": "desc"},
+    {"content_id.keyword": "asc"},
+]
+# Facet name: keyword field it aggregates and filters on
+FACETS = {
+    'platform': 'platform.keyword',
+    'mimetype': 'mimetype.keyword',
+    'uploader': 'post.uploader.keyword',
+    'collection': 'collection_id.keyword',
+}
+UPLOAD_DATE_FACET = 'upload_date'
+UPLOAD_DATE_FIELD = 'post.upload_date'
+
+
+def encode_cursor(sort_values):
+    return base64.urlsafe_b64encode(json.dumps(sort_values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+
+
+def _get_filters(collection_ids, filters):
+    clauses = []
+    if collection_ids is not None:
+        clauses.append({"terms": {"collection_id.keyword": [str(collection_id) for collection_id in collection_ids]}})
+    for name, value in filters.items():
+        if not value:
+            continue
+        if name in FACETS:
+            clauses.append({"term": {FACETS[name]: value}})
+        elif name == UPLOAD_DATE_FACET:
+            # Whole month selected from the histogram
+            clauses.append({
+                "range": {UPLOAD_DATE_FIELD: {"gte": f'{value}||/M', "lte": f'{value}||/M', "format": "yyyy-MM"}}
+            })
+    return clauses
+
+
+def _get_aggregations():
+    aggregations = {
+        name: {"terms": {"field": field, "size": settings.SEARCH_FACET_SIZE}} for name, field in FACETS.items()
+    }
+    aggregations['collection']['aggs'] = {
+        'name': {"terms": {"field": "collection_name.keyword", "size": 1}}
+    }
+    aggregations[UPLOAD_DATE_FACET] = {
+        "date_histogram": {
+            "field": UPLOAD_DATE_FIELD,
+            "calendar_interval": "month",
+            "format": "yyyy-MM",
+            "min_doc_count": 1,
+            "order": {"_key": "desc"},
+        }
+    }
+    return aggregations
+
+
+def _get_facets(aggregations):
+    facets = {}
+    for name, aggregation in aggregations.items():
+        buckets = []
+        for bucket in aggregation.get('buckets', []):
+            key = bucket.get('key_as_string', bucket.get('key'))
+            label = key
+            if 'name' in bucket and bucket['name']['buckets']:
+                label = bucket['name']['buckets'][0]['key']
+            buckets.append({'key': key, 'label': label, 'count': bucket.get('doc_count')})
+        facets[name] = buckets
+    return facets
+
+
+def _get_page_query(query, cursor=None, size=None, aggregations=None):
+    size = size or settings.SEARCH_PAGE_SIZE
+    body = {
+        "query": query,
+        "_source": SOURCE_FIELDS,
+        "sort": SORT,
+        "size": size,
+    }
+    search_after = decode_cursor(cursor)
+    if search_after:
+        body['search_after'] = search_after
+    if aggregations:
+        # Computed on every page, the facets stay displayed along the following pages
+        body['aggs'] = aggregations
+    return body, size
+
+
+def _get_results(index, body, size):
+    raw_results = get_es_connection().search(index=index, body=body)
+    hits = raw_results['hits']['hits']
+    total = raw_results['hits']['total']
+    return {
+        'results': transform_hl_results(raw_results),
+        'total': total.get('value'),
+        'total_is_lower_bound': total.get('relation') == 'gte',
+        'facets': _get_facets(raw_results.get('aggregations', {})),
+        'next_cursor': encode_cursor(hits[-1]['sort']) if len(hits) == size else None,
+    }
+
+
+def search_contents(q, collection_ids=None, filters=None, cursor=None, size=None):
+    """
+    Return a page of the contents matching the query string `q` in the given collections, in all of them if
+    `collection_ids` is None. Pages are chained with `next_cursor`, the facets cover all the matching contents.
+    """
+    query = {
+        "bool": {
+            "must": {
+                "query_string": {
+                    "default_field": "sha256",
+                    "query": q
+                }
+            },
+            "filter": _get_filters(collection_ids, filters or {}),
+            "must_not": {"term": {"is_hidden": True}},
+        }
+    }
+    index = settings.ELASTICSEARCH_SEARCH_ALIAS
+    body, size = _get_page_query(query, cursor, size, _get_aggregations())
+    body['highlight'] = {
+        "fields": {
+            field: {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]} for field in HIGHLIGHTED_FIELDS
+        }
+    }
+    return _get_results(index, body, size)
+
+
+def get_collection_page(batch, cursor=None, size=None):
+    """
+    Return a page of the contents of a collection, most recent first, chained with `next_cursor`.
+    """
+    index = batch.get_es_index()
+    body, size = _get_page_query({"match_all": {}}, cursor, size)
+    return _get_results(index, body, size)
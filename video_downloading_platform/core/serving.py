@@ -0,0 +1,104 @@
+import re
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+
+from video_downloading_platform.core.storage import stream_stored_file
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _parse_range(range_header, size):
+    """
+    Parse a single range `Range` header. Returns the (start, end) tuple of the requested bytes, None if the header
+    has to be ignored and False if the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(range_header.strip())
+    if not match:
+        # Malformed or multiple ranges, serve the whole file
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range, the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        return False
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _get_presigned_url(field_file, content_type, content_disposition):
+    storage = field_file.storage
+    client = getattr(storage, 'base_url_client', None)
+    if client is None:
+        return None
+    url = client.presigned_get_object(
+        storage.bucket_name,
+        field_file.name,
+        expires=timedelta(seconds=settings.CONTENT_PRESIGNED_URL_MAX_AGE),
+        response_headers={
+            'response-content-type': content_type,
+            'response-content-disposition': content_disposition,
+        }
+    )
+    # Same rewriting as MinioStorage.url(), the public base URL already contains the bucket
+    url_parts = urlsplit(url)
+    base_url_parts = urlsplit(storage.base_url)
+    path = base_url_parts.path + url_parts.path[len(storage.bucket_name) + 1:]
+    return urlunsplit((url_parts.scheme, url_parts.netloc, path, url_parts.query, url_parts.fragment))
+
+
+def serve_stored_file(request, field_file, content_type, filename=None, disposition='inline', etag=None):
+    """
+    Serve a stored file honouring `Range`, `If-Range` and `If-None-Match` headers. The content is streamed from
+    the storage, or the client is redirected to a pre-signed URL when CONTENT_SERVING_REDIRECT is enabled.
+    """
+    content_disposition = f'{disposition}; filename={filename}' if filename else disposition
+
+    if settings.CONTENT_SERVING_REDIRECT:
+        url = _get_presigned_url(field_file, content_type, content_disposition)
+        if url:
+            return HttpResponseRedirect(url)
+
+    etag = f'"{etag}"' if etag else None
+    if etag and request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size = field_file.size
+    start, end = 0, size - 1
+    status = 200
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or (etag and if_range == etag)):
+        requested_range = _parse_range(range_header, size)
+        if requested_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if requested_range:
+            start, end = requested_range
+            status = 206
+
+    length = end - start + 1
+    chunks = stream_stored_file(field_file, offset=start, length=length) if length > 0 else iter([])
+    response = StreamingHttpResponse(chunks, status=status, content_type=content_type)
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if etag:
+        response['ETag'] = etag
+    return response
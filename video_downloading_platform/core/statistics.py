@@ -0,0 +1,100 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from video_downloading_platform.core.models import Batch, DownloadRequest, DownloadedContent, StatisticsSnapshot, \
+    StorageUsage
+
+logger = logging.getLogger(__name__)
+
+
+def _count_per_owner(model, since, until):
+    """
+    Count the objects created in the given period per owner, all the ones created until then without `since`.
+    """
+    queryset = model.objects.filter(created_at__lte=until)
+    if since:
+        queryset = queryset.filter(created_at__gt=since)
+    rows = queryset.values('owner_id').annotate(count=Count('id')).values_list('owner_id', 'count').order_by()
+    return dict(rows)
+
+
+def _get_failures_per_domain():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """SELECT count(id) as failure, split_part(url, '/', 3) as domain
+            FROM core_downloadrequest
+            WHERE status='FAILED' AND length(split_part(url, '/', 3))>1
+            GROUP BY domain
+            ORDER BY failure desc
+            LIMIT 25""")
+        return [{'failure': failure, 'domain': domain} for failure, domain in cursor.fetchall()]
+
+
+def compute_statistics_snapshot():
+    """
+    Compute and store a new statistics snapshot. It is updated incrementally from the previous one: the collections,
+    requests and files created since its watermark are counted and added to its counters, and the failures per
+    domain are carried over. A full snapshot recomputes everything from scratch once in a while, accounting for the
+    deleted objects, and is kept as history. Request statuses change over time, they are counted with a single
+    grouped query each time, and the space usage is read from the running totals maintained as contents are stored
+    and deleted.
+    """
+    now = timezone.now()
+    previous = StatisticsSnapshot.objects.first()
+    last_full = StatisticsSnapshot.objects.filter(full=True).only('created_at').first()
+    full = not previous or not last_full or \
+        last_full.created_at < now - timedelta(seconds=settings.STATISTICS_FULL_REFRESH_INTERVAL)
+    since = None if full else previous.contents_watermark
+    space_per_owner = dict(StorageUsage.objects.values_list('owner_id', 'size_bytes'))
+
+    # Scanning every failed request is the costly part, only done by full snapshots
+    failures = [] if full else previous.failures
+    if full:
+        try:
+            failures = _get_failures_per_domain()
+        except Exception as e:
+            logger.error(e)
+
+    counters = {
+        'collections': _count_per_owner(Batch, since, now),
+        'requests': _count_per_owner(DownloadRequest, since, now),
+        'files': _count_per_owner(DownloadedContent, since, now),
+    }
+    previous_stats = {} if full else {u.get('id'): u for u in previous.user_stats}
+    user_stats = []
+    for user_id, username in get_user_model().objects.values_list('id', 'username'):
+        stats = {'id': user_id, 'name': username}
+        for name, counts in counters.items():
+            stats[name] = previous_stats.get(user_id, {}).get(name, 0) + counts.get(user_id, 0)
+        stats['used_disk_space'] = space_per_owner.get(user_id, 0)
+        user_stats.append(stats)
+
+    statuses = dict(
+        DownloadRequest.objects.values('status').annotate(count=Count('id')).values_list('status', 'count').order_by()
+    )
+    snapshot = StatisticsSnapshot.objects.create(
+        full=full,
+        contents_watermark=now,
+        collections=sum(u['collections'] for u in user_stats),
+        requests=sum(statuses.values()),
+        requests_succeeded=statuses.get(DownloadRequest.Status.SUCCEEDED, 0),
+        requests_failed=statuses.get(DownloadRequest.Status.FAILED, 0),
+        files=sum(u['files'] for u in user_stats),
+        users=len(user_stats),
+        used_space=sum(u['used_disk_space'] for u in user_stats),
+        failures=failures,
+        user_stats=user_stats,
+    )
+
+    # Keep the full snapshots as daily history, the incremental ones only for a while
+    StatisticsSnapshot.objects.filter(
+        full=False,
+        created_at__lt=now - timedelta(seconds=settings.STATISTICS_HISTORY_RETENTION)
+    ).delete()
+    return snapshot
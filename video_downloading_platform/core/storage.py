@@ -0,0 +1,127 @@
+import io
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+
+
+def stream_stored_file(field_file, offset=0, length=0, chunk_size=None):
+    """
+    Iterate over the content of a stored file, or over `length` bytes of it starting at `offset`, without
+    staging it locally first. A length of 0 means until the end of the file.
+    """
+    chunk_size = chunk_size or settings.STORAGE_CHUNK_SIZE
+    storage = field_file.storage
+    client = getattr(storage, 'client', None)
+    if client is None:
+        yield from _stream_local_file(storage, field_file.name, offset, length, chunk_size)
+        return
+
+    response = client.get_partial_object(storage.bucket_name, field_file.name, offset, length)
+    try:
+        yield from response.stream(chunk_size)
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def _stream_local_file(storage, name, offset, length, chunk_size):
+    with storage.open(name, 'rb') as f:
+        f.seek(offset)
+        remaining = length or None
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = f.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """
+    Write-only file object uploading what is written to it to MinIO as a multipart upload, one part at a time,
+    so that files of unknown size can be stored without being staged locally. The public client API can't upload
+    parts of a stream of unknown size, this relies on the private methods of minio 6.x, pinned in the requirements.
+    """
+
+    def __init__(self, storage, name, content_type='application/octet-stream', part_size=None):
+        super().__init__()
+        self.client = storage.client
+        self.bucket_name = storage.bucket_name
+        self.name = name
+        self.content_type = content_type
+        self.part_size = part_size or settings.STORAGE_MULTIPART_PART_SIZE
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = {}
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.part_size:
+            self._upload_part(bytes(self.buffer[:self.part_size]))
+            del self.buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, data):
+        from minio.definitions import UploadPart
+        if self.upload_id is None:
+            self.upload_id = self.client._new_multipart_upload(
+                self.bucket_name, self.name, {'Content-Type': self.content_type}
+            )
+        part_number = len(self.parts) + 1
+        etag, _ = self.client._do_put_object(
+            self.bucket_name, self.name, data, len(data), upload_id=self.upload_id, part_number=part_number
+        )
+        self.parts[part_number] = UploadPart(
+            self.bucket_name, self.name, self.upload_id, part_number, etag, None, len(data)
+        )
+
+    def complete(self):
+        if self.upload_id is None:
+            # Everything fits in a single part
+            self.client.put_object(
+                self.bucket_name, self.name, io.BytesIO(self.buffer), len(self.buffer), self.content_type
+            )
+        else:
+            if self.buffer:
+                self._upload_part(bytes(self.buffer))
+            self.client._complete_multipart_upload(self.bucket_name, self.name, self.upload_id, self.parts)
+        self.buffer = bytearray()
+
+    def abort(self):
+        if self.upload_id is not None:
+            self.client._remove_incomplete_upload(self.bucket_name, self.name, self.upload_id)
+            self.upload_id = None
+
+
+def save_streamed(field_file, filename, write, content_type='application/octet-stream'):
+    """
+    Store the bytes written by `write(file)` as the content of `field_file`. With MinIO they are uploaded as they
+    are produced, other storages get a spooled temporary file. The model instance is not saved.
+    """
+    storage = field_file.storage
+    name = field_file.field.generate_filename(field_file.instance, filename)
+    name = storage.get_available_name(name, max_length=field_file.field.max_length)
+
+    if getattr(storage, 'client', None) is None:
+        with SpooledTemporaryFile(max_size=settings.STORAGE_CHUNK_SIZE) as tmp:
+            write(tmp)
+            tmp.seek(0)
+            name = storage.save(name, File(tmp, name=name))
+    else:
+        name = storage._sanitize_path(name)
+        writer = MultipartUploadWriter(storage, name, content_type)
+        try:
+            write(writer)
+            writer.complete()
+        except Exception:
+            writer.abort()
+            raise
+
+    field_file.name = name
+    field_file._committed = True
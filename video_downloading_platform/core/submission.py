@@ -0,0 +1,219 @@
+import csv
+import io
+import logging
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+
+from video_downloading_platform.core.dispatch import dispatch_download_requests
+from video_downloading_platform.core.events import publish_batch_statuses
+from video_downloading_platform.core.models import Batch, DownloadRequest, URLSubmission
+from video_downloading_platform.core.queues import BULK, enqueue, get_submission_queue, pipelined_broker
+from video_downloading_platform.core.tagging import bulk_tag
+from video_downloading_platform.core.tasks import probe_automatic_requests
+
+logger = logging.getLogger(__name__)
+
+# Rejected items beyond this number are counted but their errors are not kept
+MAX_SUBMISSION_ERRORS = 100
+
+
+def submit_download_requests(user, batch, urls, request_type=DownloadRequest.AUTOMATIC, content_warning=None,
+                             tags=None, submission=None):
+    """
+    Create the download requests of the given URLs in the collection with a few bulk queries and queue them once
+    the transaction commits. Automatic requests are probed first, the other ones are handed to the dispatcher.
+    Shared by the views, the API and the management commands. Returns the created download requests.
+    """
+    automatic = request_type == DownloadRequest.AUTOMATIC
+    status = DownloadRequest.Status.CREATED if automatic else DownloadRequest.Status.ENQUEUED
+    download_requests = [
+        DownloadRequest(
+            batch=batch,
+            url=url,
+            owner=user,
+            type=request_type,
+            status=status,
+            content_warning=content_warning,
+            submission=submission
+        )
+        for url in (url.strip() for url in urls) if url
+    ]
+    if not download_requests:
+        return []
+
+    with transaction.atomic():
+        DownloadRequest.objects.bulk_create(download_requests, batch_size=settings.SUBMISSION_BATCH_SIZE)
+        if tags:
+            bulk_tag(DownloadRequest, {download_request.id: tags for download_request in download_requests})
+        Batch.objects.filter(id=batch.id).update(updated_at=timezone.now())
+
+    transaction.on_commit(lambda: publish_batch_statuses([batch.id]))
+    if automatic:
+        request_ids = [str(download_request.id) for download_request in download_requests]
+        transaction.on_commit(lambda: _enqueue_probes(request_ids))
+    else:
+        transaction.on_commit(dispatch_download_requests)
+    return download_requests
+
+
+def _enqueue_probes(request_ids):
+    queue = get_submission_queue(len(request_ids))
+    size = settings.SUBMISSION_BATCH_SIZE
+    with pipelined_broker(queue) as broker:
+        for i in range(0, len(request_ids), size):
+            enqueue(queue, probe_automatic_requests, request_ids[i:i + size], broker=broker)
+
+
+def canonicalize_url(url):
+    """
+    Normalized form of a URL used to find duplicates: lowercase scheme and host, no default port, no empty query or
+    fragment and / as the empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rpartition(':')[2]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rpartition(':')[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, parts.fragment))
+
+
+def _clean_item(item, validate_url):
+    """
+    Canonical URL, content warning and tags of a submitted item, either a URL or an object with a `url` and optionally
+    a `content_warning` and `tags`.
+    """
+    if isinstance(item, str):
+        item = {'url': item}
+    if not isinstance(item, dict):
+        raise ValidationError('Expected a URL or an object.')
+    url = item.get('url')
+    if not isinstance(url, str):
+        raise ValidationError('Missing URL.')
+    url = url.strip()
+    validate_url(url)
+    url = canonicalize_url(url)
+    if len(url) > DownloadRequest._meta.get_field('url').max_length:
+        raise ValidationError('URL too long.')
+    content_warning = item.get('content_warning')
+    if content_warning is not None and not isinstance(content_warning, str):
+        raise ValidationError('The content warning must be a string.')
+    tags = item.get('tags') or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) and 0 < len(tag) <= 100 for tag in tags):
+        raise ValidationError('The tags must be a list of names.')
+    return url, content_warning, tags
+
+
+def read_url_list(file, name):
+    """
+    Stream the URLs of an uploaded list opened in binary mode, one per line or, for CSV files, from the `url` column
+    or else the first one.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace', newline='')
+    if not name.lower().endswith('.csv'):
+        for line in text:
+            yield line.strip()
+        return
+
+    column = 0
+    for number, row in enumerate(csv.reader(text)):
+        if number == 0:
+            header = [cell.strip().lower() for cell in row]
+            if 'url' in header:
+                column = header.index('url')
+                continue
+        yield row[column].strip() if len(row) > column else ''
+
+
+def _iter_items(submission):
+    if not submission.source:
+        yield from submission.items or []
+        return
+    with submission.source.open('rb') as f:
+        for url in read_url_list(f, submission.source.name):
+            # Blank lines are not counted as items
+            if url:
+                submission.received_count += 1
+                yield url
+
+
+def _submit_chunk(submission, chunk):
+    groups = {}
+    for url, content_warning, tags in chunk:
+        key = (content_warning or submission.content_warning, tuple(sorted(set(submission.tags + tags))))
+        groups.setdefault(key, []).append(url)
+    with transaction.atomic():
+        for (content_warning, tags), urls in groups.items():
+            submit_download_requests(
+                submission.owner, submission.batch, urls, submission.type, content_warning, list(tags), submission
+            )
+            submission.accepted_count += len(urls)
+        submission.save(update_fields=[
+            'received_count', 'accepted_count', 'duplicate_count', 'rejected_count', 'errors', 'updated_at'
+        ])
+
+
+def _process_items(submission):
+    validate_url = URLValidator()
+    # URLs already requested in the collection are skipped as well
+    seen = {
+        canonicalize_url(url)
+        for url in DownloadRequest.objects.filter(batch=submission.batch).values_list('url', flat=True).iterator()
+    }
+    chunk = []
+    for index, item in enumerate(_iter_items(submission)):
+        try:
+            url, content_warning, tags = _clean_item(item, validate_url)
+        except ValidationError as e:
+            submission.rejected_count += 1
+            if len(submission.errors) < MAX_SUBMISSION_ERRORS:
+                submission.errors.append({'index': index, 'error': ' '.join(e.messages)})
+            continue
+        if url in seen:
+            submission.duplicate_count += 1
+            continue
+        seen.add(url)
+        chunk.append((url, content_warning, tags))
+        # Requests are created and queued chunk by chunk, the counters report the progress meanwhile
+        if len(chunk) >= settings.SUBMISSION_BATCH_SIZE:
+            _submit_chunk(submission, chunk)
+            chunk = []
+    _submit_chunk(submission, chunk)
+
+
+def process_url_submission(submission_id):
+    """
+    Validate the items or the uploaded list of a submission and create their download requests. Invalid items and
+    URLs already submitted to the collection are counted and skipped.
+    """
+    claimed = URLSubmission.objects \
+        .filter(id=submission_id, status=URLSubmission.Status.RECEIVED) \
+        .update(status=URLSubmission.Status.PROCESSING)
+    if not claimed:
+        return
+    submission = URLSubmission.objects.select_related('owner', 'batch').get(id=submission_id)
+    try:
+        _process_items(submission)
+        submission.status = URLSubmission.Status.SUCCEEDED
+    except Exception as e:
+        logger.exception(e)
+        submission.status = URLSubmission.Status.FAILED
+        submission.message = str(e)
+    if submission.source:
+        submission.source.delete(save=False)
+    submission.items = None
+    submission.save()
+
+
+def queue_url_submission(submission):
+    """
+    Queue the processing of the given submission once the transaction commits.
+    """
+    # Uploaded lists are counted while they are read, they are expected to be large
+    queue = BULK if submission.source else get_submission_queue(submission.received_count)
+    submission_id = str(submission.id)
+    transaction.on_commit(lambda: enqueue(queue, process_url_submission, submission_id))
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from taggit.models import Tag
+
+from video_downloading_platform.core.models import UUIDTaggedItem
+
+
+def _get_or_create_tags(names):
+    tags = {}
+    for name in names:
+        tag = Tag.objects.filter(name__iexact=name).first()
+        if not tag:
+            tag = Tag.objects.create(name=name)
+        tags[name] = tag
+    return tags
+
+
+def get_tag_names(model, object_ids):
+    """
+    Map each of the given objects to the names of its tags.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    rows = UUIDTaggedItem.objects \
+        .filter(content_type=content_type, object_id__in=object_ids) \
+        .values_list('object_id', 'tag__name')
+    tag_names = {}
+    for object_id, name in rows:
+        tag_names.setdefault(object_id, []).append(name)
+    return tag_names
+
+
+def bulk_tag(model, tag_names):
+    """
+    Tag newly created objects at once, `tag_names` maps each object ID to the names of the tags to add. Unlike
+    `tags.add()`, this takes a few queries whatever the number of objects.
+    """
+    names = {name for names in tag_names.values() for name in names}
+    if not names:
+        return
+    tags = _get_or_create_tags(names)
+    content_type = ContentType.objects.get_for_model(model)
+    UUIDTaggedItem.objects.bulk_create(
+        [
+            UUIDTaggedItem(tag=tag, content_type=content_type, object_id=object_id)
+            for object_id, names in tag_names.items()
+            for tag in {tags[name] for name in names}
+        ],
+        batch_size=settings.SUBMISSION_BATCH_SIZE
+    )
@@ -1,49 +1,38 @@
 import glob
-import hashlib
 import json
 import logging
+import os
+import shutil
 import tempfile
 import traceback
-import zipfile
-from os import path
 from tempfile import NamedTemporaryFile
-from urllib.parse import urlparse
 from zipfile import ZipFile
 
-import exiftool
-import magic
 import requests
 import yt_dlp as youtube_dl
-from dateutil.parser import parse
-from django.core.files import File
+from django.db.models import QuerySet
 from django.urls import reverse_lazy
-from elasticsearch_dsl import Index
 from notifications.signals import notify
 
-from video_downloading_platform.core.indexing import Entity
+from video_downloading_platform.core.archives import write_report_archive
+from video_downloading_platform.core.dispatch import dispatch_download_requests
+from video_downloading_platform.core.entities import get_request_entities, iter_requests_for_indexing
+from video_downloading_platform.core.exif import get_exif_data
+from video_downloading_platform.core.indexing import BulkIndexer
+from video_downloading_platform.core.ingest import ingest_file
 from video_downloading_platform.core.models import (
     DownloadRequest,
     DownloadReport,
     DownloadedContent, Batch, PlatformCredentials,
 )
+from video_downloading_platform.core.probing import resolve_automatic_requests
+from video_downloading_platform.core.statistics import compute_statistics_snapshot
+from video_downloading_platform.core.storage import save_streamed, stream_stored_file
+from video_downloading_platform.core.thumbnails import create_thumbnail
 
 logger = logging.getLogger(__name__)
 
 
-def hash_file(filename):
-    if path.isfile(filename) is False:
-        raise Exception("File not found for hash operation")
-    h_sha256 = hashlib.sha256()
-    h_md5 = hashlib.md5()
-    with open(filename, 'rb') as file:
-        chunk = 0
-        while chunk != b'':
-            chunk = file.read(4096)
-            h_sha256.update(chunk)
-            h_md5.update(chunk)
-    return h_sha256.hexdigest(), h_md5.hexdigest()
-
-
 # def get_mimetype(filename):
 #     mime_type = mimetypes.MimeTypes().guess_type(filename)[0]
 #     if not mime_type:
@@ -86,92 +75,59 @@ def _get_file_metadata(directory, filename):
     return {}
 
 
-def _get_exif_data_for_file(file_path):
-    if not file_path:
-        return {}
-    if 'webpage_screenshot.png' in file_path:
-        return {}
-    if file_path.endswith('.json') or file_path.endswith('.description'):
-        return {}
+def process_uploaded_content(content_id, download_request_id, report_id):
+    """
+    Compute the EXIF data and the thumbnail of an uploaded file, then index it and build the archive of its report.
+    Uploads are received by the web containers, the stored file is streamed once into a temporary file for both.
+    """
+    logger.info(f'Process uploaded content {content_id}')
+    downloaded_content = DownloadedContent.objects.filter(id=content_id).first()
+    if downloaded_content and downloaded_content.content:
+        with NamedTemporaryFile() as tmp:
+            for chunk in stream_stored_file(downloaded_content.content):
+                tmp.write(chunk)
+            tmp.flush()
+            downloaded_content.exif_data = get_exif_data([tmp.name]).get(tmp.name, {})
+            update_fields = ['exif_data']
+            if not downloaded_content.thumbnail and create_thumbnail(downloaded_content, tmp.name):
+                update_fields.append('thumbnail')
+        downloaded_content.save(update_fields=update_fields)
+    index_download_request_by_id(download_request_id)
+    create_zip_archive(report_id)
 
-    try:
-        with exiftool.ExifToolHelper() as et:
-            metadata = et.get_metadata(file_path)[0]
-            return metadata
-    except Exception as e:
-        logger.error(e)
-    return {}
 
-
-def compute_downloaded_content_metadata(downloaded_content_id, download_request_id, create_archive=False):
-    logger.info(f'Compute downloaded content metadata {downloaded_content_id}')
-    h_sha256 = hashlib.sha256()
-    h_sha1 = hashlib.sha1()
-    h_md5 = hashlib.md5()
-    try:
-        downloaded_content: DownloadedContent = DownloadedContent.objects.get(id=downloaded_content_id)
-    except Exception as e:
-        logger.error(e)
-        return
-
-    with NamedTemporaryFile() as tmp:
-        for chunk in downloaded_content.content.chunks():
-            tmp.write(chunk)
-            h_sha256.update(chunk)
-            h_sha1.update(chunk)
-            h_md5.update(chunk)
-        tmp.seek(0)
-        mime_type = magic.from_buffer(tmp.read(2048), mime=True)
-        tmp.seek(0)
-        exif = _get_exif_data_for_file(tmp.name)
-
-    downloaded_content.md5 = h_md5.hexdigest()
-    downloaded_content.sha256 = h_sha256.hexdigest()
-    downloaded_content.mime_type = mime_type
-    downloaded_content.exif_data = exif
-    downloaded_content.metadata['md5'] = h_md5.hexdigest()
-    downloaded_content.metadata['sha1'] = h_sha1.hexdigest()
-    downloaded_content.metadata['sha256'] = h_sha256.hexdigest()
-    downloaded_content.metadata['mime_type'] = mime_type
-    downloaded_content.save()
-    index_download_request_by_id(download_request_id)
-    if create_archive:
-        create_zip_archive(downloaded_content.download_report.id)
+def create_downloaded_content_thumbnail(content_id):
+    content = DownloadedContent.objects.filter(id=content_id).first()
+    if content and not content.thumbnail and create_thumbnail(content):
+        content.save(update_fields=['thumbnail'])
 
 
 def _manage_downloaded_files(directory, owner, download_report, cw, request_type=None):
-    for downloaded_file in glob.glob(f'{directory}/*', recursive=True):
-        sha256, md5 = hash_file(downloaded_file)
+    downloaded_files = glob.glob(f'{directory}/*', recursive=True)
+    exif = get_exif_data(downloaded_files)
+    for downloaded_file in downloaded_files:
         cleaned_name = downloaded_file.replace(directory, '')
         if cleaned_name.startswith('/'):
             cleaned_name = cleaned_name[1:]
-        mime_type = magic.from_file(downloaded_file, mime=True)
         mime_prefix = ''
         if request_type == DownloadRequest.VIDEO:
             mime_prefix = 'video'
         elif request_type == DownloadRequest.GALLERY:
             mime_prefix = 'image'
-        is_target = False
-        if mime_type.startswith(mime_prefix) and 'thumbnail' not in cleaned_name:
-            is_target = True
         metadata = _get_file_metadata(directory, cleaned_name)
-        exif_data = _get_exif_data_for_file(downloaded_file)
+        exif_data = exif.get(downloaded_file, {})
         downloaded_content = DownloadedContent(
             download_report=download_report,
             owner=owner,
-            md5=md5,
-            sha256=sha256,
             name=cleaned_name,
             metadata=metadata,
-            target_file=is_target,
             exif_data=exif_data,
-            mime_type=mime_type,
         )
-        downloaded_content.save()
-        mode = 'rb'
-        with open(downloaded_file, mode=mode) as content:
-            content_file = File(content)
-            downloaded_content.content.save(cleaned_name, content_file)
+        with open(downloaded_file, mode='rb') as content:
+            ingest_file(downloaded_content, content)
+        create_thumbnail(downloaded_content, downloaded_file)
+        downloaded_content.target_file = downloaded_content.mime_type.startswith(mime_prefix) \
+            and 'thumbnail' not in cleaned_name
         downloaded_content.save()
 
 
@@ -189,78 +145,75 @@ def take_url_screenshot(url, output_dir):
                         s.write(screenshot_file.read())
 
 
-def run_download_video_request(download_request_id):
-    download_request = DownloadRequest.objects.get(id=download_request_id)
-    download_request.status = DownloadRequest.Status.PROCESSING
+def _complete_download_request(download_request, download_report, tmp_dir):
+    """
+    Take the screenshot of the page and store the files downloaded in `tmp_dir` along with it.
+    """
+    owner = download_request.owner
+    # Take URL screenshot
+    take_url_screenshot(download_request.url, tmp_dir)
+
+    _manage_downloaded_files(tmp_dir, owner, download_report, download_request.content_warning,
+                             download_request.type)
+
+    download_request.status = DownloadRequest.Status.SUCCEEDED
     download_request.save()
+
+    create_zip_archive(download_report.id)
+    index_download_request(download_request)
+
+    actions = [
+        {
+            'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(
+                download_request.id),
+            'title': 'View files'}
+    ]
+    notify.send(owner, recipient=owner, verb='',
+                description='Your files have been successfully downloaded',
+                public=False,
+                actions=actions)
+
+
+def _fail_download_request(download_request, download_report):
     owner = download_request.owner
-    download_report = DownloadReport(
-        download_request=download_request,
-        owner=owner
-    )
+    download_report.in_error = True
+    error_message = download_report.error_message
+    if not error_message:
+        error_message = ''
+    error_message += '\n' + traceback.format_exc()
+    download_report.error_message = error_message
     download_report.save()
-    try:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            options = {
-                'outtmpl': f'{tmp_dir}/%(id)s-%(autonumber)s.%(ext)s',
-                'format': 'best',
-                'writedescription': True,
-                'writeinfojson': True,
-                'writeannotations': True,
-                'writethumbnail': True,
-                'noplaylist': False,
-                'overwrites': False,
-            }
-            with youtube_dl.YoutubeDL(options) as ydl:
-                print('downloading video', download_request.url)
-                ydl.download([download_request.url])
-
-            # Take URL screenshot
-            take_url_screenshot(download_request.url, tmp_dir)
-
-            _manage_downloaded_files(tmp_dir, owner, download_report, download_request.content_warning,
-                                     download_request.type)
-
-            download_request.status = DownloadRequest.Status.SUCCEEDED
-            download_request.save()
-
-            create_zip_archive(download_report.id)
-            index_download_request(download_request)
-
-            actions = [
-                {
-                    'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(
-                        download_request.id),
-                    'title': 'View files'}
-            ]
-            notify.send(owner, recipient=owner, verb='',
-                        description='Your files have been successfully downloaded',
-                        public=False,
-                        actions=actions)
-    except Exception as e:
-        logger.error(e)
-        download_report.in_error = True
-        error_message = download_report.error_message
-        if not error_message:
-            error_message = ''
-        error_message += '\n' + traceback.format_exc()
-        download_report.error_message = error_message
-        download_report.save()
-        download_request.status = DownloadRequest.Status.FAILED
-        download_request.save()
-        actions = [
-            {
-                'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(download_request.id),
-                'title': 'View details'}
-        ]
-        notify.send(owner, recipient=owner, verb='',
-                    level='error',
-                    description='Your request has failed',
-                    public=False,
-                    actions=actions)
+    download_request.status = DownloadRequest.Status.FAILED
+    download_request.save()
+    actions = [
+        {
+            'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(download_request.id),
+            'title': 'View details'}
+    ]
+    notify.send(owner, recipient=owner, verb='',
+                level='error',
+                description='Your request has failed',
+                public=False,
+                actions=actions)
+
+
+def _download_with_ydl(url, tmp_dir):
+    options = {
+        'outtmpl': f'{tmp_dir}/%(id)s-%(autonumber)s.%(ext)s',
+        'format': 'best',
+        'writedescription': True,
+        'writeinfojson': True,
+        'writeannotations': True,
+        'writethumbnail': True,
+        'noplaylist': False,
+        'overwrites': False,
+    }
+    with youtube_dl.YoutubeDL(options) as ydl:
+        print('downloading video', url)
+        ydl.download([url])
 
 
-def run_download_gallery_request(download_request_id):
+def _download_with_gdl(url, tmp_dir):
     from gallery_dl import config, job
     config.set((), "filename", "{id}-{num}.{extension}")
     config.set((), "directory", "")
@@ -274,6 +227,11 @@ def run_download_gallery_request(download_request_id):
             }
         ]
     )
+    config.set((), "base-directory", tmp_dir)
+    return job.DownloadJob(url).run()
+
+
+def run_download_video_request(download_request_id):
     download_request = DownloadRequest.objects.get(id=download_request_id)
     download_request.status = DownloadRequest.Status.PROCESSING
     download_request.save()
@@ -285,52 +243,71 @@ def run_download_gallery_request(download_request_id):
     download_report.save()
     try:
         with tempfile.TemporaryDirectory() as tmp_dir:
-            config.set((), "base-directory", tmp_dir)
-            job.DownloadJob(download_request.url).run()
-
-            # Take URL screenshot
-            take_url_screenshot(download_request.url, tmp_dir)
-
-            _manage_downloaded_files(tmp_dir, owner, download_report, download_request.content_warning,
-                                     download_request.type)
-
-            download_request.status = DownloadRequest.Status.SUCCEEDED
-            download_request.save()
-
-            create_zip_archive(download_report.id)
-            index_download_request(download_request)
-
-            actions = [
-                {
-                    'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(
-                        download_request.id),
-                    'title': 'View files'}
-            ]
-            notify.send(owner, recipient=owner, verb='',
-                        description='Your files have been successfully downloaded',
-                        public=False,
-                        actions=actions)
+            _download_with_ydl(download_request.url, tmp_dir)
+            _complete_download_request(download_request, download_report, tmp_dir)
     except Exception as e:
         logger.error(e)
-        download_report.in_error = True
-        error_message = download_report.error_message
-        if not error_message:
-            error_message = ''
-        error_message += '\n' + traceback.format_exc()
-        download_report.error_message = error_message
-        download_report.save()
-        download_request.status = DownloadRequest.Status.FAILED
-        download_request.save()
-        actions = [
-            {
-                'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(download_request.id),
-                'title': 'View details'}
-        ]
-        notify.send(owner, recipient=owner, verb='',
-                    level='error',
-                    description='Your request has failed',
-                    public=False,
-                    actions=actions)
+        _fail_download_request(download_request, download_report)
+
+
+def run_download_gallery_request(download_request_id):
+    download_request = DownloadRequest.objects.get(id=download_request_id)
+    download_request.status = DownloadRequest.Status.PROCESSING
+    download_request.save()
+    owner = download_request.owner
+    download_report = DownloadReport(
+        download_request=download_request,
+        owner=owner
+    )
+    download_report.save()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _download_with_gdl(download_request.url, tmp_dir)
+            _complete_download_request(download_request, download_report, tmp_dir)
+    except Exception as e:
+        logger.error(e)
+        _fail_download_request(download_request, download_report)
+
+
+def run_download_automatic_request(download_request_id):
+    """
+    Download a URL no downloader is known to be suitable for: yt-dlp is tried first and gallery-dl only if it did
+    not download anything, in the same temporary directory and with a single report and screenshot.
+    """
+    download_request = DownloadRequest.objects.get(id=download_request_id)
+    download_request.status = DownloadRequest.Status.PROCESSING
+    download_request.save()
+    owner = download_request.owner
+    download_report = DownloadReport(
+        download_request=download_request,
+        owner=owner
+    )
+    download_report.save()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            errors = []
+            for request_type, download in [(DownloadRequest.VIDEO, _download_with_ydl),
+                                           (DownloadRequest.GALLERY, _download_with_gdl)]:
+                try:
+                    download(download_request.url, tmp_dir)
+                    if os.listdir(tmp_dir):
+                        download_request.type = request_type
+                        break
+                except Exception as e:
+                    errors.append(f'{request_type}: {e}')
+                    # Drop what a failed attempt left behind before trying the next downloader
+                    for name in os.listdir(tmp_dir):
+                        path = os.path.join(tmp_dir, name)
+                        if os.path.isdir(path):
+                            shutil.rmtree(path)
+                        else:
+                            os.remove(path)
+            else:
+                raise Exception('Nothing could be downloaded. ' + ' '.join(errors))
+            _complete_download_request(download_request, download_report, tmp_dir)
+    except Exception as e:
+        logger.error(e)
+        _fail_download_request(download_request, download_report)
 
 
 def run_download_from_telegram(download_request_id):
@@ -369,252 +346,61 @@ def run_download_from_telegram(download_request_id):
 
             tg_downloader.download(tmp_dir)
 
-            # Take URL screenshot
-            take_url_screenshot(download_request.url, tmp_dir)
-
-            _manage_downloaded_files(tmp_dir, owner, download_report, download_request.content_warning,
-                                     download_request.type)
-
-            download_request.status = DownloadRequest.Status.SUCCEEDED
-            download_request.save()
-
-            create_zip_archive(download_report.id)
-            index_download_request(download_request)
-
-            actions = [
-                {
-                    'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(
-                        download_request.id),
-                    'title': 'View files'}
-            ]
-            notify.send(owner, recipient=owner, verb='',
-                        description='Your files have been successfully downloaded',
-                        public=False,
-                        actions=actions)
+            _complete_download_request(download_request, download_report, tmp_dir)
     except Exception as e:
         logger.error(e)
-        download_report.in_error = True
-        error_message = download_report.error_message
-        if not error_message:
-            error_message = ''
-        error_message += '\n' + traceback.format_exc()
-        download_report.error_message = error_message
-        download_report.save()
-        download_request.status = DownloadRequest.Status.FAILED
-        download_request.save()
-        actions = [
-            {
-                'url': reverse_lazy('batch_details', args=[download_request.batch.id]) + '#' + str(download_request.id),
-                'title': 'View details'}
-        ]
-        notify.send(owner, recipient=owner, verb='',
-                    level='error',
-                    description='Your request has failed',
-                    public=False,
-                    actions=actions)
+        _fail_download_request(download_request, download_report)
 
 
 def create_zip_archive(report_id):
     logger.info(f'Create archive for download report {report_id}')
     download_report = DownloadReport.objects.get(id=report_id)
     try:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            files_to_archive = []
-            for downloaded_content in download_report.downloadedcontent_set.all():
-                if downloaded_content.content:
-                    with open(f'{tmp_dir}/{downloaded_content.name}', mode='wb') as out:
-                        for chunk in downloaded_content.content.chunks():
-                            out.write(chunk)
-                        out.seek(0)
-                        files_to_archive.append({
-                            'path': out.name,
-                            'name': downloaded_content.name,
-                        })
-                    if downloaded_content.exif_data:
-                        with open(f'{tmp_dir}/{downloaded_content.name}-exif.json', mode='w') as out:
-                            out.write(json.dumps(downloaded_content.exif_data, indent=2))
-                        files_to_archive.append({
-                            'path': out.name,
-                            'name': f'{downloaded_content.name}-exif.json',
-                        })
-                    if downloaded_content.metadata:
-                        with open(f'{tmp_dir}/{downloaded_content.name}-metadata.json', mode='w') as out:
-                            out.write(json.dumps(downloaded_content.metadata, indent=2))
-                        files_to_archive.append({
-                            'path': out.name,
-                            'name': f'{downloaded_content.name}-metadata.json',
-                        })
-
-            with open(f'{tmp_dir}/archive.zip', mode='wb') as tmp:
-                zf = zipfile.ZipFile(tmp, "w")
-                for file in files_to_archive:
-                    zf.write(file.get('path'), file.get('name'))
-                zf.close()
-            with open(f'{tmp_dir}/archive.zip', mode='rb') as tmp:
-                download_report.archive.save('archive.zip', tmp)
+        previous_archive = download_report.archive.name if download_report.archive else None
+        save_streamed(
+            download_report.archive,
+            'archive.zip',
+            lambda f: write_report_archive(download_report, f),
+            content_type='application/zip'
+        )
+        download_report.save()
+        if previous_archive and previous_archive != download_report.archive.name:
+            download_report.archive.storage.delete(previous_archive)
     except Exception as e:
         logger.error(e)
 
 
-def __try_recovering_date(d, default='1970-01-01'):
-    try:
-        return parse(d)
-    except:
-        return parse(default)
-
-
-def __parse_exif(exif):
-    ignore = [
-        'ICC_Profile',
-        'Composite',
-        'Photoshop',
-        'JFIF',
-        'MakerNotes',
-        'APP14',
-    ]
-    data = {}
-
-    if not exif or type(exif) is list:
-        return data
-
-    def should_ignore(key: str):
-        if ':' in key:
-            key = key.split(':')[0]
-        return bool(key in ignore)
-
-    for k, v in exif.items():
-        if should_ignore(k):
-            continue
-        k = k.replace(':', '_')
-        if 'date' in k.lower():
-            data[k] = __try_recovering_date(v)
-        elif type(v) is set:
-            data[k] = list(v)
-        else:
-            data[k] = v
-    return data
-
-
-def get_in_dict(keys, obj, default=''):
-    for k in keys:
-        if k in obj:
-            val = obj.get(k)
-            if not val or val == 'none':
-                return default
-            return val
-    return default
+def index_download_requests(requests, indexer: BulkIndexer = None):
+    """
+    Index the contents of all the given download requests through a single bulk indexing run. Querysets are loaded
+    with their related objects prefetched.
+    """
+    indexer = indexer or BulkIndexer()
+    batches = {}
+    if isinstance(requests, QuerySet):
+        requests = iter_requests_for_indexing(requests)
 
+    def entities():
+        for request in requests:
+            batches[request.batch_id] = request.batch
+            yield from get_request_entities(request)
 
-def index_download_request(request: DownloadRequest):
-    from elasticsearch_dsl import connections
-    connections.create_connection(hosts=['elasticsearch'], timeout=20)
+    indexer.index(entities())
 
-    index_name = request.get_es_index()
-    try:
-        index = Index(index_name)
-        if not index.exists():
-            index.create()
-    except Exception as e:
-        logger.error(e)
-        return
+    # Updated rather than saved, saving a batch invalidates the visibility caches
+    indexed_batch_ids = [
+        batch.id for batch in batches.values() if batch.get_es_index() in indexer.prepared_indexes
+    ]
+    if indexed_batch_ids:
+        Batch.objects.filter(id__in=indexed_batch_ids, indexed=False).update(indexed=True)
 
-    Entity.init(index=index_name)
-    print(f'Is hidden {request.id}: [{request.is_hidden}]')
-
-    for report in request.report.all():
-        for content in report.downloadedcontent_set.all():
-            if content.name.endswith('.json') or content.name.endswith('.description'):
-                continue
-            # if not content.target_file:
-            #     continue
-            entity = Entity()
-            entity.meta.id = str(content.id)
-            entity.created_at = request.created_at
-            entity.content_id = str(content.id)
-            entity.owner = str(request.owner.username)
-            entity.owner_id = str(request.owner.id)
-            entity.tags = [str(t) for t in request.tags.all()]
-            entity.request_id = str(request.id)
-            entity.is_hidden = bool(request.is_hidden)
-            entity.collection_id = str(request.batch.id)
-            entity.collection_name = str(request.batch.name)
-            entity.collection_description = str(request.batch.description)
-            entity.origin = request.url
-            entity.mimetype = content.mime_type
-            entity.md5 = content.md5
-            entity.sha256 = content.sha256
-            entity.status = request.get_status_display()
-            entity.thumbnail_content_id = report.get_thumbnail_id_for(content.name)
-            entity.exif = '\n'.join([f'{k}: {v}' for k, v in __parse_exif(content.exif_data).items()])
-            entity.content_warning = request.content_warning
-
-            if request.type == DownloadRequest.VIDEO or request.type == DownloadRequest.GALLERY:
-                entity.type = request.type.lower()
-                entity.stats = {
-                    'view_count': get_in_dict([
-                        'views',
-                        'view_count',
-                    ], content.metadata, -1),
-                    'like_count': get_in_dict([
-                        'reactions',
-                        'like_count',
-                        'fav_count',
-                        'favourites_count',
-                        'favorite_count'
-                    ],  content.metadata, -1),
-                    'comment_count': get_in_dict([
-                        'replies',
-                        'comment_count',
-                        'replies_count',
-                        'reply_count'
-                    ], content.metadata, -1),
-                }
-                entity.post = {
-                    'uploader': get_in_dict([
-                        'uploader',
-                    ], content.metadata),
-                    'uploader_url': get_in_dict([
-                        'uploader_url',
-                    ], content.metadata),
-                    'uploader_id': str(get_in_dict([
-                        'uploader_id',
-                    ], content.metadata, '-1'), ),
-                    'title': get_in_dict([
-                        'title',
-                    ], content.metadata, content.name),
-                    'description': get_in_dict([
-                        'message',
-                        'fulltitle',
-                        'description',
-                        'content',
-                        'tag_string',
-                    ], content.metadata),
-                    'upload_date': __try_recovering_date(get_in_dict([
-                        'date',
-                        'edit_date',
-                        'created_at',
-                    ], content.metadata, '1970-01-01')),
-                }
-                entity.webpage_url = get_in_dict([
-                    'webpage_url',
-                ], content.metadata)
-                entity.platform = get_in_dict([
-                    'extractor_key',
-                    'platform',
-                ], content.metadata, urlparse(request.url).netloc)
-
-            if request.url == 'http://dummy.url.local':
-                entity.origin = 'User upload'
-                entity.platform = 'VHS'
-                entity.post = {
-                    'title': content.name,
-                    'description': content.metadata.get('description'),
-                }
-
-            entity.save(index=index_name)
-
-    request.batch.indexed = True
-    request.batch.save()
+    for error in indexer.errors:
+        logger.error(f'Unable to index {error.get("id")} in {error.get("index")}: {error.get("error")}')
+    return indexer
+
+
+def index_download_request(request: DownloadRequest):
+    index_download_requests(DownloadRequest.objects.filter(id=request.id))
 
 
 def index_download_request_by_id(request_id: str):
@@ -628,8 +414,7 @@ def index_collection_by_id(batch_id: str):
     batch: Batch = Batch.objects.get(id=batch_id)
     if not batch:
         return
-    for dr in batch.download_requests.all():
-        index_download_request(dr)
+    index_download_requests(batch.download_requests.all())
 
 
 def delete_collection_by_id(batch_id: str):
@@ -640,3 +425,13 @@ def delete_collection_by_id(batch_id: str):
         batch.delete()
     except Exception as e:
         logger.error(e)
+
+
+def probe_automatic_requests(request_ids):
+    resolve_automatic_requests(request_ids)
+    dispatch_download_requests()
+
+
+def update_statistics_snapshot():
+    snapshot = compute_statistics_snapshot()
+    logger.info(f'Statistics snapshot {snapshot.id} computed (full: {snapshot.full})')
@@ -0,0 +1,65 @@
+import pytest
+from rest_framework.test import APIClient
+
+from video_downloading_platform.core.models import Batch, URLSubmission
+from video_downloading_platform.users.models import User
+from video_downloading_platform.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(user: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def batch(user: User) -> Batch:
+    return Batch.objects.create(name="Collection", owner=user)
+
+
+def _submit(client, batch, key=None, items=None):
+    headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+    data = {"collection": str(batch.id), "items": items or ["https://example.com/video"]}
+    return client.post("/api/submissions/", data, format="json", **headers)
+
+
+def test_submission_is_received(client: APIClient, batch: Batch):
+    response = _submit(client, batch, items=["https://example.com/a", {"url": "https://example.com/b"}])
+    assert response.status_code == 202
+    assert response.data["status"] == URLSubmission.Status.RECEIVED
+    assert response.data["received_count"] == 2
+
+
+def test_retry_with_the_same_key_returns_the_submission(client: APIClient, batch: Batch):
+    first = _submit(client, batch, key="retry-1")
+    second = _submit(client, batch, key="retry-1", items=["https://example.com/other"])
+    assert first.status_code == 202
+    assert second.status_code == 200
+    assert second.data["id"] == first.data["id"]
+    assert URLSubmission.objects.count() == 1
+
+
+def test_submissions_without_key_are_distinct(client: APIClient, batch: Batch):
+    assert _submit(client, batch).data["id"] != _submit(client, batch).data["id"]
+    assert _submit(client, batch, key="a").data["id"] != _submit(client, batch, key="b").data["id"]
+
+
+def test_keys_are_scoped_to_the_user(client: APIClient, batch: Batch):
+    other = UserFactory()
+    other_client = APIClient()
+    other_client.force_authenticate(other)
+    other_batch = Batch.objects.create(name="Other", owner=other)
+    first = _submit(client, batch, key="shared")
+    second = _submit(other_client, other_batch, key="shared")
+    assert second.status_code == 202
+    assert second.data["id"] != first.data["id"]
+
+
+def test_submission_to_another_users_collection_is_refused(client: APIClient):
+    other_batch = Batch.objects.create(name="Other", owner=UserFactory())
+    response = _submit(client, other_batch)
+    assert response.status_code == 400
+    assert not URLSubmission.objects.exists()
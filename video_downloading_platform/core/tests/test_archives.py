@@ -0,0 +1,42 @@
+import io
+import zipfile
+
+from video_downloading_platform.core.archives import ZipStream, ZipStreamEntry
+
+DATE_TIME = (2021, 6, 1, 12, 30, 0)
+
+
+def _entry(name, data, chunk_size=3):
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    return ZipStreamEntry(name=name, size=len(data), date_time=DATE_TIME, chunks=lambda: iter(chunks))
+
+
+def test_zip_stream_size_matches_streamed_bytes():
+    zip_stream = ZipStream([
+        _entry('a.zip', b'first archive'),
+        _entry('é.zip', b''),
+        _entry('c.zip', b'x' * 1000),
+    ])
+    data = b''.join(zip_stream)
+    assert len(data) == zip_stream.size
+
+
+def test_zip_stream_offsets_point_to_the_entries():
+    contents = {'a.zip': b'first archive', 'b.zip': b'second', 'c.zip': b'x' * 1000}
+    zip_stream = ZipStream([_entry(name, data) for name, data in contents.items()])
+    with zipfile.ZipFile(io.BytesIO(b''.join(zip_stream))) as zf:
+        assert zf.testzip() is None
+        assert [info.filename for info in zf.infolist()] == list(contents.keys())
+        for name, data in contents.items():
+            assert zf.read(name) == data
+            assert zf.getinfo(name).date_time == DATE_TIME
+
+
+def test_zip_stream_size_is_unknown_without_every_entry_size():
+    zip_stream = ZipStream([
+        _entry('a.zip', b'known'),
+        ZipStreamEntry(name='b.zip', size=None, date_time=DATE_TIME, chunks=lambda: iter([b'unknown'])),
+    ])
+    assert zip_stream.size is None
+    with zipfile.ZipFile(io.BytesIO(b''.join(zip_stream))) as zf:
+        assert zf.read('b.zip') == b'unknown'
@@ -0,0 +1,75 @@
+import io
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+
+from video_downloading_platform.core.blobs import acquire_blob, release_blob
+from video_downloading_platform.core.ingest import ingest_file
+from video_downloading_platform.core.models import ContentBlob, DownloadedContent
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+SHA256 = "a" * 64
+
+
+@pytest.fixture(autouse=True)
+def file_storage(settings):
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+
+
+def test_blob_is_stored_once_and_shared():
+    first = acquire_blob(io.BytesIO(b"content"), SHA256, 7)
+    second = acquire_blob(io.BytesIO(b"content"), SHA256, 7)
+    assert first.pk == second.pk
+    assert second.ref_count == 2
+    assert ContentBlob.objects.get(sha256=SHA256).ref_count == 2
+    assert first.content.storage.exists(first.content.name)
+
+
+def test_blob_is_deleted_with_its_last_reference():
+    blob = acquire_blob(io.BytesIO(b"content"), SHA256, 7)
+    acquire_blob(io.BytesIO(b"content"), SHA256, 7)
+    storage, name = blob.content.storage, blob.content.name
+
+    release_blob(SHA256)
+    assert ContentBlob.objects.get(sha256=SHA256).ref_count == 1
+    assert storage.exists(name)
+
+    release_blob(SHA256)
+    assert not ContentBlob.objects.filter(sha256=SHA256).exists()
+    assert not storage.exists(name)
+
+
+def test_releasing_an_unknown_blob_is_a_no_op():
+    release_blob(SHA256)
+    assert not ContentBlob.objects.exists()
+
+
+def test_blob_released_during_a_conflicting_insert_is_stored_again():
+    save = ContentBlob.save
+    conflicts = []
+
+    def conflicting_save(blob, *args, **kwargs):
+        # The first insert conflicts with a blob which is then released before it can be referenced
+        if not conflicts:
+            conflicts.append(blob)
+            raise IntegrityError()
+        return save(blob, *args, **kwargs)
+
+    with mock.patch.object(ContentBlob, "save", conflicting_save):
+        blob = acquire_blob(io.BytesIO(b"content"), SHA256, 7)
+    assert len(conflicts) == 1
+    assert ContentBlob.objects.get(sha256=SHA256).ref_count == 1
+    assert blob.content.storage.exists(blob.content.name)
+
+
+def test_identical_contents_share_a_blob():
+    first = DownloadedContent()
+    second = DownloadedContent()
+    digests = ingest_file(first, io.BytesIO(b"same bytes"))
+    ingest_file(second, io.BytesIO(b"same bytes"))
+    assert first.blob_id == second.blob_id == digests["sha256"]
+    assert first.size_bytes == 10
+    assert first.content.name == second.content.name
+    assert ContentBlob.objects.get(sha256=digests["sha256"]).ref_count == 2
@@ -0,0 +1,53 @@
+from video_downloading_platform.core.dispatch import plan_dispatch
+
+
+def _requests(prefix, count):
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def test_users_are_served_in_turn():
+    pending = {"alice": {"a": _requests("a", 10)}, "bob": {"b": _requests("b", 10)}}
+    released = plan_dispatch(pending, {}, 4, 4, {})
+    assert released == ["a0", "b0", "a1", "b1"]
+
+
+def test_least_active_users_come_first():
+    pending = {"alice": {"a": _requests("a", 10)}, "bob": {"b": _requests("b", 10)}}
+    released = plan_dispatch(pending, {"alice": 2}, 3, 4, {})
+    assert released == ["b0", "a0", "b1"]
+
+
+def test_collections_of_a_user_are_served_in_turn():
+    pending = {"alice": {"a": _requests("a", 10), "b": _requests("b", 10)}}
+    released = plan_dispatch(pending, {}, 4, 4, {})
+    assert released == ["a0", "b0", "a1", "b1"]
+
+
+def test_weights_give_more_requests_per_round():
+    pending = {"alice": {"a": _requests("a", 10)}, "bob": {"b": _requests("b", 10)}}
+    released = plan_dispatch(pending, {}, 6, 10, {"alice": 2})
+    assert released == ["a0", "a1", "b0", "a2", "a3", "b1"]
+
+
+def test_cap_holds_while_others_are_waiting():
+    pending = {"alice": {"a": _requests("a", 10)}, "bob": {"b": _requests("b", 10)}}
+    released = plan_dispatch(pending, {"alice": 3}, 4, 4, {})
+    assert [r for r in released if r.startswith("a")] == ["a0"]
+    assert [r for r in released if r.startswith("b")] == ["b0", "b1", "b2"]
+
+
+def test_idle_capacity_goes_past_the_cap():
+    pending = {"alice": {"a": _requests("a", 20)}}
+    released = plan_dispatch(pending, {}, 12, 4, {})
+    assert released == _requests("a", 12)
+
+
+def test_capacity_left_once_everyone_is_capped_is_shared():
+    pending = {"alice": {"a": _requests("a", 20)}, "bob": {"b": _requests("b", 2)}}
+    released = plan_dispatch(pending, {}, 8, 2, {})
+    assert released == ["a0", "b0", "a1", "b1", "a2", "a3", "a4", "a5"]
+
+
+def test_nothing_is_released_without_capacity():
+    pending = {"alice": {"a": _requests("a", 10)}}
+    assert plan_dispatch(pending, {}, 0, 4, {}) == []
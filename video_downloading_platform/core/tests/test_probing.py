@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+from video_downloading_platform.core.models import DownloadRequest
+from video_downloading_platform.core.probing import get_request_types_to_run
+
+
+def test_probe_result_only_types_the_probed_url():
+    cache.clear()
+    urls = ["https://videos.example.org/watch/1", "https://videos.example.org/about"]
+    with mock.patch("video_downloading_platform.core.probing._probe_with_ydl", return_value=True) as probe:
+        request_types = get_request_types_to_run(urls)
+    probe.assert_called_once_with(urls[0])
+    assert request_types[urls[0]] == [DownloadRequest.VIDEO]
+    # Other pages of the domain may have no video, both downloaders are tried
+    assert request_types[urls[1]] == [DownloadRequest.AUTOMATIC]
+
+
+def test_cached_probe_result_runs_in_automatic_mode():
+    cache.clear()
+    with mock.patch("video_downloading_platform.core.probing._probe_with_ydl", return_value=True):
+        get_request_types_to_run(["https://videos.example.org/watch/1"])
+    with mock.patch("video_downloading_platform.core.probing._probe_with_ydl") as probe:
+        request_types = get_request_types_to_run(["https://videos.example.org/watch/2"])
+    probe.assert_not_called()
+    assert request_types["https://videos.example.org/watch/2"] == [DownloadRequest.AUTOMATIC]
+
+
+def test_negative_probe_runs_in_automatic_mode():
+    cache.clear()
+    urls = ["https://pages.example.org/a", "https://pages.example.org/b"]
+    with mock.patch("video_downloading_platform.core.probing._probe_with_ydl", return_value=False):
+        request_types = get_request_types_to_run(urls)
+    assert request_types == {url: [DownloadRequest.AUTOMATIC] for url in urls}
@@ -0,0 +1,34 @@
+import pytest
+
+from video_downloading_platform.core.search import _get_page_query, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    sort_values = [1623412345000, "2b1f0c9e-5d3a-4a8e-9f1e-3c7b2a6d4e5f"]
+    cursor = encode_cursor(sort_values)
+    assert decode_cursor(cursor) == sort_values
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["???>>>~~~", 1])
+    assert not set(cursor) & {"+", "/"}
+
+
+@pytest.mark.parametrize("cursor", [None, "", "not a cursor", "bm90IGpzb24="])
+def test_invalid_cursor_is_ignored(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_page_query_continues_after_the_cursor():
+    cursor = encode_cursor([1623412345000, "abc"])
+    body, size = _get_page_query({"match_all": {}}, cursor, 10, {"type": {"terms": {"field": "type"}}})
+    assert size == 10
+    assert body["search_after"] == [1623412345000, "abc"]
+    # Facets are requested on the following pages too
+    assert "aggs" in body
+
+
+def test_first_page_query_has_no_cursor(settings):
+    body, size = _get_page_query({"match_all": {}})
+    assert size == settings.SEARCH_PAGE_SIZE
+    assert "search_after" not in body
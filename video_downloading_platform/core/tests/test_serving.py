@@ -0,0 +1,28 @@
+import pytest
+
+from video_downloading_platform.core.serving import _parse_range
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-2000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        (" bytes=10-20 ", (10, 20)),
+    ],
+)
+def test_parse_range(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    assert _parse_range(header, 1000) is False
+
+
+@pytest.mark.parametrize("header", ["", "bytes=-", "bytes=20-10", "bytes=0-1,5-9", "items=0-10", "bytes=a-b"])
+def test_parse_range_ignored(header):
+    assert _parse_range(header, 1000) is None
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import pytest
+
+from video_downloading_platform.core.models import Batch, StatisticsSnapshot
+from video_downloading_platform.core.statistics import compute_statistics_snapshot
+from video_downloading_platform.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def _user_stats(snapshot, user):
+    return next(stats for stats in snapshot.user_stats if stats["id"] == user.id)
+
+
+def test_snapshots_are_updated_incrementally(user: User):
+    Batch.objects.create(name="First", owner=user)
+    first = compute_statistics_snapshot()
+    assert first.full
+    assert first.collections == 1
+
+    Batch.objects.create(name="Second", owner=user)
+    second = compute_statistics_snapshot()
+    assert not second.full
+    assert second.collections == 2
+    assert _user_stats(second, user)["collections"] == 2
+    assert second.contents_watermark > first.contents_watermark
+
+
+def test_full_snapshot_accounts_for_deleted_objects(settings, user: User):
+    batch = Batch.objects.create(name="First", owner=user)
+    compute_statistics_snapshot()
+    batch.delete()
+    # Deletions are not seen by incremental updates
+    assert compute_statistics_snapshot().collections == 1
+
+    StatisticsSnapshot.objects.filter(full=True).update(
+        created_at=StatisticsSnapshot.objects.first().created_at
+        - timedelta(seconds=settings.STATISTICS_FULL_REFRESH_INTERVAL + 1)
+    )
+    snapshot = compute_statistics_snapshot()
+    assert snapshot.full
+    assert snapshot.collections == 0
+    assert _user_stats(snapshot, user)["collections"] == 0
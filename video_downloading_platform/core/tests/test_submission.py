@@ -0,0 +1,86 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from video_downloading_platform.core.models import Batch, DownloadRequest, URLSubmission
+from video_downloading_platform.core.submission import canonicalize_url, process_url_submission, read_url_list
+from video_downloading_platform.users.models import User
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("HTTPS://Example.COM/Path?q=1", "https://example.com/Path?q=1"),
+        ("https://example.com:443/a", "https://example.com/a"),
+        ("http://example.com:80", "http://example.com/"),
+        ("http://example.com:8080/", "http://example.com:8080/"),
+        ("https://example.com/a?#", "https://example.com/a"),
+        ("  https://example.com/a#frag  ", "https://example.com/a#frag"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_read_text_list():
+    data = b"https://example.com/a\r\n\n  https://example.com/b  \n"
+    assert list(read_url_list(io.BytesIO(data), "urls.txt")) == ["https://example.com/a", "", "https://example.com/b"]
+
+
+def test_read_csv_list_with_a_url_column():
+    data = "\ufeffname,URL\nfirst,https://example.com/a\nsecond,\"https://example.com/b?x=1,2\"\nthird\n".encode()
+    assert list(read_url_list(io.BytesIO(data), "urls.CSV")) == [
+        "https://example.com/a", "https://example.com/b?x=1,2", ""
+    ]
+
+
+def test_read_csv_list_without_header():
+    data = b"https://example.com/a,comment\nhttps://example.com/b\n"
+    assert list(read_url_list(io.BytesIO(data), "urls.csv")) == ["https://example.com/a", "https://example.com/b"]
+
+
+@pytest.mark.django_db
+def test_uploaded_list_is_processed(settings, user: User):
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    batch = Batch.objects.create(name="Collection", owner=user)
+    DownloadRequest.objects.create(batch=batch, owner=user, url="https://example.com/existing")
+    submission = URLSubmission(owner=user, batch=batch, type=DownloadRequest.VIDEO)
+    submission.source.save("urls.txt", ContentFile(
+        b"https://example.com/a\nHTTPS://EXAMPLE.COM:443/a\nnot a url\n\nhttps://example.com/existing\n"
+    ), save=False)
+    submission.save()
+
+    process_url_submission(submission.id)
+
+    submission.refresh_from_db()
+    assert submission.status == URLSubmission.Status.SUCCEEDED
+    assert submission.received_count == 4
+    assert submission.accepted_count == 1
+    assert submission.duplicate_count == 2
+    assert submission.rejected_count == 1
+    assert submission.errors == [{"index": 2, "error": "Enter a valid URL."}]
+    assert not submission.source
+    assert set(batch.download_requests.values_list("url", flat=True)) == {
+        "https://example.com/existing", "https://example.com/a"
+    }
+
+
+@pytest.mark.django_db
+def test_submit_urls_command_streams_the_list(settings, tmp_path, user: User):
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    batch = Batch.objects.create(name="Collection", owner=user)
+    urls = tmp_path / "urls.csv"
+    urls.write_text("url\nhttps://example.com/a\nhttps://example.com:443/a\nnot a url\n")
+    out, err = io.StringIO(), io.StringIO()
+
+    call_command("submit_urls", str(batch.id), user.username, str(urls), stdout=out, stderr=err)
+
+    submission = URLSubmission.objects.get(batch=batch)
+    assert submission.items is None
+    assert not submission.source
+    assert submission.received_count == 3
+    assert list(batch.download_requests.values_list("url", flat=True)) == ["https://example.com/a"]
+    assert "1 download requests submitted, 1 duplicates and 1 invalid URLs skipped" in out.getvalue()
+    assert "Item 2" in err.getvalue()
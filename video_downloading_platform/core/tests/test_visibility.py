@@ -0,0 +1,34 @@
+import pytest
+
+from video_downloading_platform.core.models import Batch
+from video_downloading_platform.core.visibility import get_visible_batch_ids
+from video_downloading_platform.users.models import User
+from video_downloading_platform.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_visible_batches_follow_ownership_and_status(user: User):
+    batch = Batch.objects.create(name="Collection", owner=user)
+    assert get_visible_batch_ids(user) == {batch.status: {batch.id}}
+
+    batch.close()
+    batch.save()
+    assert get_visible_batch_ids(user) == {Batch.CLOSED: {batch.id}}
+
+    batch.owner = UserFactory()
+    batch.save()
+    assert get_visible_batch_ids(user) == {}
+
+
+def test_other_changes_keep_the_cache(user: User, django_assert_num_queries):
+    batch = Batch.objects.create(name="Collection", owner=user)
+    get_visible_batch_ids(user)
+
+    Batch.objects.get(id=batch.id).save()
+    renamed = Batch.objects.only("id", "name").get(id=batch.id)
+    renamed.name = "Renamed"
+    renamed.save(update_fields=["name"])
+
+    with django_assert_num_queries(0):
+        assert get_visible_batch_ids(user) == {batch.status: {batch.id}}
@@ -0,0 +1,91 @@
+import io
+import logging
+from functools import lru_cache
+from tempfile import NamedTemporaryFile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from video_downloading_platform.core.models import DownloadedContent
+from video_downloading_platform.core.storage import stream_stored_file
+
+logger = logging.getLogger(__name__)
+
+
+def has_thumbnail_source(downloaded_content: DownloadedContent):
+    mime_type = downloaded_content.mime_type or ''
+    return bool(downloaded_content.content) and (mime_type.startswith('image') or mime_type.startswith('video'))
+
+
+def _get_video_frame(file_path):
+    """
+    Same approach as `TelegramPostDownloader.__create_thumbnails`, grab the frame in the middle of the video.
+    """
+    import cv2
+    cap = cv2.VideoCapture(file_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count / 2))
+        success, frame = cap.read()
+        if not success:
+            return None
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    finally:
+        cap.release()
+
+
+def _render_thumbnail(image: Image.Image):
+    size = settings.THUMBNAIL_SIZE
+    # Let the JPEG decoder downscale while decoding, much faster on large pictures
+    image.draft('RGB', size)
+    image.thumbnail(size)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=settings.THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def _create_thumbnail_from_path(downloaded_content: DownloadedContent, file_path):
+    if downloaded_content.mime_type.startswith('video'):
+        image = _get_video_frame(file_path)
+        if image is None:
+            return None
+        return _render_thumbnail(image)
+    with Image.open(file_path) as image:
+        return _render_thumbnail(image)
+
+
+def create_thumbnail(downloaded_content: DownloadedContent, file_path=None):
+    """
+    Generate the JPEG thumbnail of an image or a video and store it next to the original content. The original is
+    read from `file_path` when it is available locally, from the storage otherwise.
+    The downloaded content is updated but not saved. Returns True if a thumbnail has been created.
+    """
+    if not has_thumbnail_source(downloaded_content):
+        return False
+    try:
+        if file_path:
+            data = _create_thumbnail_from_path(downloaded_content, file_path)
+        else:
+            with NamedTemporaryFile() as tmp:
+                for chunk in stream_stored_file(downloaded_content.content):
+                    tmp.write(chunk)
+                tmp.flush()
+                data = _create_thumbnail_from_path(downloaded_content, tmp.name)
+    except Exception as e:
+        logger.error(f'Unable to create the thumbnail of {downloaded_content.id}: {e}')
+        return False
+    if not data:
+        return False
+    downloaded_content.thumbnail.save('thumbnail.jpg', ContentFile(data), save=False)
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_placeholder_thumbnail():
+    placeholder = Image.new('RGB', settings.THUMBNAIL_SIZE, (128, 128, 128))
+    output = io.BytesIO()
+    placeholder.save(output, 'JPEG')
+    return output.getvalue()
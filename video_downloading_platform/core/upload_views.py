@@ -1,8 +1,10 @@
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from django.http.response import JsonResponse
 from django.shortcuts import get_object_or_404
 import json
 from video_downloading_platform.core.models import UploadRequest
+from video_downloading_platform.core.quotas import check_storage_quota
 from video_downloading_platform.core.serializers import UploadRequestSerializer
 import logging
 import hashlib
@@ -17,6 +19,10 @@ def initialize_upload(request):
         try:
             payload = json.loads(request.body.decode('utf-8'))
             file_size = int(payload.get('file_size'))
+            try:
+                check_storage_quota(request.user, size=file_size)
+            except ValidationError as e:
+                return JsonResponse({'message': ' '.join(e.messages)}, status=403)
             upload_request = UploadRequest(
                 owner=request.user,
                 size=file_size,
@@ -1,32 +1,48 @@
+import hashlib
+import json
+import logging
 import traceback
-import zipfile
-from io import BytesIO
+from functools import partial
+from urllib.parse import urlencode
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.files import File
-from django.db import transaction
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
 from django.forms import model_to_dict
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
-from django.utils import timezone
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_cache_control
 from django.utils.translation import gettext as _
-from django.views.decorators.cache import cache_page
 from django.views.generic import UpdateView
-from django_q.tasks import async_task
 from notifications.signals import notify
 from notifications.utils import id2slug
 
+from video_downloading_platform.core.archives import ZipStream, ZipStreamEntry
+from video_downloading_platform.core.events import stream_status_events, subscribe_status_events
 from video_downloading_platform.core.forms import BatchForm, BatchRequestForm, UploadForm, BatchTeamForm, \
-    DownloadRequestLightForm, SearchForm
+    DownloadRequestLightForm, SearchForm, URLImportForm
+from video_downloading_platform.core.ingest import ingest_file
 from video_downloading_platform.core.models import Batch, DownloadRequest, DownloadedContent, DownloadReport, \
-    _get_request_types_to_run, BatchTeam
-from video_downloading_platform.core.tasks import compute_downloaded_content_metadata, index_collection_by_id, \
-    index_download_request, delete_collection_by_id
-from video_downloading_platform.users.admin import User
+    BatchTeam, StatisticsSnapshot, URLSubmission
+from video_downloading_platform.core.queues import MAINTENANCE, enqueue
+from video_downloading_platform.core.quotas import check_storage_quota
+from video_downloading_platform.core.search import get_collection_page
+from video_downloading_platform.core.serving import serve_stored_file
+from video_downloading_platform.core.storage import stream_stored_file
+from video_downloading_platform.core.submission import queue_url_submission, submit_download_requests
+from video_downloading_platform.core.tasks import index_collection_by_id, index_download_request, \
+    delete_collection_by_id, process_uploaded_content, create_downloaded_content_thumbnail
+from video_downloading_platform.core.thumbnails import get_placeholder_thumbnail, has_thumbnail_source
+from video_downloading_platform.core.visibility import is_admin
+
+logger = logging.getLogger(__name__)
 
 
 def _start_pending_async_tasks(tasks: list):
@@ -69,10 +85,9 @@ def handle_file_upload(request, upload_form, batch):
             target_file=True,
             description=upload_form.cleaned_data['description']
         )
-        downloaded_content.save()
         with open(upload_request.path, mode='rb') as f:
-            downloaded_content.content.save(upload_request.name, File(f))
-            downloaded_content.save()
+            metadata.update(ingest_file(downloaded_content, f))
+        downloaded_content.save()
         download_request.status = DownloadRequest.Status.SUCCEEDED
         download_request.save()
         upload_request.cleanup()
@@ -86,8 +101,11 @@ def handle_file_upload(request, upload_form, batch):
                     description='Your files have been successfully uploaded',
                     public=False,
                     actions=actions)
-        transaction.on_commit(
-            lambda: async_task(compute_downloaded_content_metadata, downloaded_content.id, download_request.id, True))
+        # EXIF data and thumbnail are computed in the background, not within the request
+        transaction.on_commit(lambda: enqueue(
+            MAINTENANCE, process_uploaded_content, str(downloaded_content.id), str(download_request.id),
+            str(download_report.id)
+        ))
     except Exception as e:
         print(e)
         download_report.in_error = True
@@ -111,11 +129,6 @@ def handle_file_upload(request, upload_form, batch):
                     actions=actions)
 
 
-def _start_pending_requests(requests):
-    for dl_request in requests:
-        dl_request.start()
-
-
 @login_required
 def home_view(request):
     user = request.user
@@ -140,8 +153,6 @@ def home_view(request):
                 batch_form = f
 
     users_batches = Batch.get_users_open_batches(user)
-    if users_batches:
-        users_batches = users_batches.all()
 
     return render(
         request,
@@ -152,12 +163,35 @@ def home_view(request):
         })
 
 
+def _check_storage_quota(form, user, batch, size=0):
+    try:
+        check_storage_quota(user, batch, size)
+    except ValidationError as e:
+        form.add_error(None, e)
+        return False
+    return True
+
+
+def _import_url_list(user, batch, form):
+    submission = URLSubmission(
+        owner=user,
+        batch=batch,
+        type=form.cleaned_data.get('type'),
+        content_warning=form.cleaned_data.get('content_warning') or None
+    )
+    source = form.cleaned_data.get('source')
+    submission.source.save(source.name, source, save=False)
+    submission.save()
+    queue_url_submission(submission)
+
+
 @login_required
 def add_content_to_batch_view(request, batch_id):
     user = request.user
     dl_request_form = BatchRequestForm()
     dl_request_form.set_user(user)
     ul_request_form = UploadForm()
+    import_form = URLImportForm()
     batch = get_object_or_404(Batch, id=batch_id)
     dl_request_form.set_batch(batch)
 
@@ -165,38 +199,33 @@ def add_content_to_batch_view(request, batch_id):
         if 'request_download' in request.POST:
             f = BatchRequestForm(request.POST)
             f.set_user(user)
-            if f.is_valid():
-                request_type = f.cleaned_data.get('type')
-                urls = f.cleaned_data.get('urls').splitlines()
-                batch.updated_at = timezone.now()
-                batch.save()
-                tasks_to_start = []
-                for url in urls:
-                    striped_url = url.strip()
-                    if len(striped_url) > 0:
-                        tasks_to_run = _get_request_types_to_run(url, request_type)
-                        for request_type in tasks_to_run:
-                            dl_request = DownloadRequest.objects.create(
-                                batch=batch,
-                                url=striped_url,
-                                owner=user,
-                                type=request_type,
-                                content_warning=f.cleaned_data.get('content_warning')
-                            )
-                            dl_request.save()
-                            tasks_to_start.append(dl_request)
-                transaction.on_commit(lambda: _start_pending_requests(tasks_to_start))
+            if f.is_valid() and _check_storage_quota(f, user, batch):
+                submit_download_requests(
+                    user,
+                    batch,
+                    f.cleaned_data.get('urls').splitlines(),
+                    f.cleaned_data.get('type'),
+                    f.cleaned_data.get('content_warning')
+                )
                 messages.success(request, _('Your request has been successfully submitted.'))
                 return redirect(request.META.get('HTTP_REFERER'))
             else:
                 dl_request_form = f
         elif 'request_upload' in request.POST:
             f = UploadForm(request.POST, request.FILES)
-            if f.is_valid():
+            if f.is_valid() and _check_storage_quota(f, user, batch, f.cleaned_data.get('upload_request').size):
                 handle_file_upload(request, f, batch)
                 return redirect(request.META.get('HTTP_REFERER'))
             else:
                 ul_request_form = f
+        elif 'request_import' in request.POST:
+            f = URLImportForm(request.POST, request.FILES)
+            if f.is_valid() and _check_storage_quota(f, user, batch):
+                _import_url_list(user, batch, f)
+                messages.success(request, _('Your list has been uploaded, its URLs are being imported.'))
+                return redirect(request.META.get('HTTP_REFERER'))
+            else:
+                import_form = f
     return render(
         request,
         'pages/batch_add_content.html',
@@ -204,14 +233,15 @@ def add_content_to_batch_view(request, batch_id):
             'batch': batch,
             'dl_request_form': dl_request_form,
             'ul_request_form': ul_request_form,
+            'import_form': import_form,
+            'submissions': batch.submissions.filter(owner=user).defer('items')[:5],
         })
 
 
 @login_required
 def my_batches_view(request):
     user = request.user
-    user_groups = user.groups.values_list('name', flat=True)
-    admin = 'admin' in user_groups
+    admin = is_admin(user)
     batches = []
     batches.extend(Batch.get_users_open_batches(user).all())
     batches.extend(Batch.get_users_closed_batches(user).all())
@@ -263,7 +293,7 @@ def delete_batch_view(request, batch_id):
         batch = Batch.objects.get(id=batch_id)
         batch.status = Batch.ARCHIVED
         batch.save()
-        async_task(delete_collection_by_id, batch_id)
+        enqueue(MAINTENANCE, delete_collection_by_id, batch_id)
         messages.success(request, _(f'The deletion of the collection {batch.name} is processing.'))
     return redirect(request.META.get('HTTP_REFERER'))
 
@@ -280,8 +310,7 @@ def archive_batch_view(request, batch_id):
 @login_required
 def batch_details_view(request, batch_id):
     user = request.user
-    user_groups = user.groups.values_list('name', flat=True)
-    admin = 'admin' in user_groups
+    admin = is_admin(user)
     batch = Batch.objects.get(id=batch_id)
     return render(
         request,
@@ -295,44 +324,45 @@ def batch_details_view(request, batch_id):
 @login_required
 def get_downloaded_content_view(request, content_id):
     content = DownloadedContent.objects.get(id=content_id)
-    response = HttpResponse(content.content, content_type=content.mime_type)
-    response['Content-Disposition'] = 'inline; filename=' + content.name
-    return response
+    return serve_stored_file(request, content.content, content.mime_type, content.name, etag=content.sha256)
 
 
 @login_required
 def force_download_content_view(request, content_id):
     content = DownloadedContent.objects.get(id=content_id)
-    response = HttpResponse(content.content, content_type=content.mime_type)
-    response['Content-Disposition'] = 'attachment; filename=' + content.name
-    return response
+    return serve_stored_file(
+        request, content.content, content.mime_type, content.name, disposition='attachment', etag=content.sha256
+    )
 
 
 @login_required
-@cache_page(60 * 5)
 def get_downloaded_file_view(request, content_id):
     content = DownloadedContent.objects.get(id=content_id)
     try:
-        return HttpResponse(content.content, content_type=content.mime_type)
-    except Exception:
+        return serve_stored_file(request, content.content, content.mime_type, etag=content.sha256)
+    except Exception as e:
+        logger.error(e)
         return HttpResponse('')
 
 
 @login_required
-@cache_page(60 * 5)
 def get_downloaded_content_thumbnail(request, content_id):
     content = DownloadedContent.objects.get(id=content_id)
-    if content.mime_type.startswith('image') and content.content:
+    if not content.thumbnail and has_thumbnail_source(content):
+        # Created in the background, the placeholder is served meanwhile
+        if cache.add(f'thumbnail-pending-{content.id}', 1, settings.THUMBNAIL_PENDING_TTL):
+            transaction.on_commit(lambda: enqueue(MAINTENANCE, create_downloaded_content_thumbnail, str(content.id)))
+    if content.thumbnail:
         try:
-            return HttpResponse(content.content, content_type=content.mime_type)
-        except Exception:
-            return HttpResponse('')
-    else:
-        from PIL import Image
-        placeholder = Image.new('RGBA', (240, 240), (128, 128, 128))
-        response = HttpResponse(content_type="image/png")
-        placeholder.save(response, "PNG")
-        return response
+            response = serve_stored_file(request, content.thumbnail, 'image/jpeg', etag=f'{content.sha256}-thumbnail')
+            patch_cache_control(response, private=True, max_age=settings.THUMBNAIL_CACHE_MAX_AGE)
+            return response
+        except Exception as e:
+            logger.error(e)
+    # Not cached, the thumbnail replaces it once created
+    response = HttpResponse(get_placeholder_thumbnail(), content_type='image/jpeg')
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
@@ -375,41 +405,48 @@ def get_unread_notifications_view(request):
     )
 
 
+def _get_batch_statuses(user):
+    batches = Batch.get_users_open_batches(user)
+    batch_ids = list(batches.values_list('id', flat=True))
+    counters = DownloadRequest.get_batches_status_counters(batch_ids)
+    return [{'id': batch_id, **counters[batch_id]} for batch_id in batch_ids]
+
+
 @login_required
 def get_batch_status_view(request):
-    user = request.user
-    user_groups = user.groups.values_list('name', flat=True)
-    admin = 'admin' in user_groups
-    if admin:
-        batches = Batch.objects.filter(status=Batch.OPEN).all()
+    cache_key = f'batch_statuses:{request.user.id}'
+    cached = cache.get(cache_key)
+    if cached is None:
+        content = json.dumps(_get_batch_statuses(request.user), cls=DjangoJSONEncoder)
+        cached = (content, f'"{hashlib.md5(content.encode()).hexdigest()}"')
+        cache.set(cache_key, cached, settings.BATCH_STATUSES_CACHE_TTL)
+    content, etag = cached
+
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
     else:
-        batches = Batch.get_users_open_batches(user).all()
-    statuses = []
-    for batch in batches:
-        status_obj = {
-            'id': batch.id,
-            'submitted': 0,
-            'succeeded': 0,
-            'failed': 0,
-        }
-        for download_request in batch.download_requests.all():
-            status = download_request.status
-            if status == DownloadRequest.Status.CREATED:
-                status_obj['submitted'] += 1
-            elif status == DownloadRequest.Status.ENQUEUED:
-                status_obj['submitted'] += 1
-            elif status == DownloadRequest.Status.PROCESSING:
-                status_obj['submitted'] += 1
-            elif status == DownloadRequest.Status.POST_PROCESSING:
-                status_obj['submitted'] += 1
-            elif status == DownloadRequest.Status.SUCCEEDED:
-                status_obj['succeeded'] += 1
-            elif status == DownloadRequest.Status.CANCELLED:
-                status_obj['failed'] += 1
-            elif status == DownloadRequest.Status.FAILED:
-                status_obj['failed'] += 1
-        statuses.append(status_obj)
-    return JsonResponse(statuses, safe=False)
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@transaction.non_atomic_requests
+@login_required
+def batch_status_events_view(request):
+    try:
+        # Subscribe before reading the current statuses so that no change is missed in between
+        pubsub = subscribe_status_events()
+    except Exception as e:
+        logger.error(e)
+        return HttpResponse(status=503)
+    statuses = _get_batch_statuses(request.user)
+    # The stream does not use the database, do not hold a connection until it ends
+    connection.close()
+    response = StreamingHttpResponse(stream_status_events(pubsub, statuses), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @login_required
@@ -423,18 +460,29 @@ def get_report_archive_view(request, report_id):
 @login_required
 def download_collection_zip_view(request, batch_id):
     collection = Batch.objects.get(id=batch_id)
-    tmp = BytesIO()
-    with zipfile.ZipFile(tmp, 'w') as zip_file:
-        for download_request in collection.download_requests.all():
-            for download_report in download_request.report.all():
-                if download_report.archive:
-                    filename = f'{download_report.id}.zip'
-                    data = download_report.archive.file.read()
-                    zip_file.writestr(filename, data)
-        zip_file.close()
-        tmp.flush()
-    tmp.seek(0)
-    response = HttpResponse(tmp, content_type='application/zip')
+    reports = DownloadReport.objects.filter(download_request__batch=collection) \
+        .exclude(archive__isnull=True).exclude(archive='')
+    # Without the size of every archive the length is unknown and the response is streamed without Content-Length
+    sized = reports.count() <= settings.COLLECTION_ZIP_MAX_SIZED_ENTRIES
+    entries = []
+    for download_report in reports:
+        size = None
+        if sized:
+            try:
+                size = download_report.archive.size
+            except Exception as e:
+                logger.error(e)
+                sized = False
+        entries.append(ZipStreamEntry(
+            name=f'{download_report.id}.zip',
+            size=size,
+            date_time=download_report.updated_at.timetuple()[:6],
+            chunks=partial(stream_stored_file, download_report.archive),
+        ))
+    zip_stream = ZipStream(entries)
+    response = StreamingHttpResponse(zip_stream, content_type='application/zip')
+    if zip_stream.size is not None:
+        response['Content-Length'] = zip_stream.size
     response['Content-Disposition'] = f'attachment; filename=VHS-{collection.owner}-{collection.name}.zip'
     return response
 
@@ -442,11 +490,17 @@ def download_collection_zip_view(request, batch_id):
 @login_required
 def download_request_details_view(request, request_id):
     download_request = get_object_or_404(DownloadRequest, id=request_id)
+    contents = []
+    report = download_request.report.first()
+    if report:
+        contents = list(report.downloadedcontent_set.select_related('download_report__download_request__batch'))
+        DownloadedContent.fetch_indexed_data([content for content in contents if content.target_file])
     return render(
         request,
         'pages/download_request_details.html',
         {
-            'download_request': download_request
+            'download_request': download_request,
+            'contents': contents,
         }
     )
 
@@ -481,13 +535,33 @@ def mark_all_notification_read_view(request):
     return redirect(request.META.get('HTTP_REFERER'))
 
 
+@login_required
+def batch_contents_view(request, batch_id):
+    batch = get_object_or_404(Batch.get_users_batches(request.user), id=batch_id)
+    try:
+        page = get_collection_page(batch, cursor=request.GET.get('after'))
+    except Exception as e:
+        logger.error(e)
+        page = {'results': [], 'next_cursor': None}
+    next_url = None
+    if page.get('next_cursor'):
+        url = reverse('batch_contents', kwargs={'batch_id': batch.id})
+        next_url = f'{url}?{urlencode({"after": page["next_cursor"]})}'
+    html = render_to_string('partials/m_collection_contents.html', {'results': page['results']}, request=request)
+    return JsonResponse({
+        'results': page['results'],
+        'html': html,
+        'next': next_url,
+    })
+
+
 @login_required
 def batch_edit_view(request, batch_id):
     batch = get_object_or_404(Batch, id=batch_id)
     form = BatchForm(request.POST or None, instance=batch)
     if form.is_valid():
         form.save()
-        transaction.on_commit(lambda: async_task(index_collection_by_id, batch_id))
+        transaction.on_commit(lambda: enqueue(MAINTENANCE, index_collection_by_id, batch_id))
         return redirect(request.META.get('HTTP_REFERER'))
     return render(
         request,
@@ -519,71 +593,55 @@ def edit_download_request_view(request, request_id):
     )
 
 
-def __get_user_space_usage(user_id):
-    from django.db import connection
-    with connection.cursor() as cursor:
-        cursor.execute(f"""SELECT sum(text(exif_data->'File:FileSize')::int) as space
-                FROM core_downloadedcontent
-                WHERE jsonb_exists(exif_data, 'File:FileSize') AND owner_id={user_id}
-                GROUP BY owner_id""")
-        row = cursor.fetchone()
-    return row[0]
-
-
-def __get_user_stats():
-    stats = []
-    for user in User.objects.all():
-        used_disk_space = -1
-        try:
-            used_disk_space = __get_user_space_usage(user.id)
-        except Exception:
-            pass
-        data = {
-            'name': user.username,
-            'collections': Batch.objects.filter(owner=user).count(),
-            'requests': DownloadRequest.objects.filter(owner=user).count(),
-            'files': DownloadedContent.objects.filter(owner=user).count(),
-            'used_disk_space': used_disk_space,
-        }
-        stats.append(data)
-    return stats
-
-
-def dictfetchall(cursor):
-    # Return all rows from a cursor as a dict
-    columns = [col[0] for col in cursor.description]
-    return [
-        dict(zip(columns, row))
-        for row in cursor.fetchall()
-    ]
-
-
-def __get_failures_per_domain():
-    from django.db import connection
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """SELECT count(id) as failure, split_part(url, '/', 3) as domain
-            FROM core_downloadrequest
-            WHERE status='FAILED' AND length(split_part(url, '/', 3))>1
-            GROUP BY domain
-            ORDER BY failure desc
-            LIMIT 25""")
-        return dictfetchall(cursor)
+def _get_search_url(request, **params):
+    """
+    URL of the current search with the given parameters replaced, going back to the first page.
+    """
+    query = request.GET.copy()
+    query.pop('after', None)
+    for name, value in params.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = value
+    return f'?{query.urlencode()}'
 
 
 @login_required
 def search_view(request):
     user = request.user
-    results = []
+    page = {}
+    facets = {}
+    next_url = None
     q = None
     search_form = SearchForm()
-    if request.method == 'POST':
-        search_form = SearchForm(request.POST)
+    if 'q' in request.GET:
+        search_form = SearchForm(request.GET)
         if search_form.is_valid():
-            results = search_form.do_search(indexes=Batch.get_users_batch_es_indexes(user))
+            page = search_form.do_search(
+                collection_ids=Batch.get_users_searchable_collection_ids(user),
+                cursor=request.GET.get('after')
+            )
             q = search_form.cleaned_data['q']
+            for name, buckets in page.get('facets', {}).items():
+                selected = search_form.cleaned_data.get(name)
+                facets[name] = {
+                    'selected': selected,
+                    'clear_url': _get_search_url(request, **{name: None}),
+                    'buckets': [
+                        {**bucket, 'url': _get_search_url(request, **{name: bucket['key']})} for bucket in buckets
+                    ],
+                }
+            if page.get('next_cursor'):
+                query = request.GET.copy()
+                query['after'] = page['next_cursor']
+                next_url = f'?{query.urlencode()}'
     return render(request, 'pages/search.html', {
-        'results': results,
+        'results': page.get('results', []),
+        'total': page.get('total', 0),
+        'total_is_lower_bound': page.get('total_is_lower_bound', False),
+        'facets': facets,
+        'next_url': next_url,
         'q': q,
         'search_form': search_form,
     })
@@ -603,9 +661,10 @@ def statistics_view(request):
     import psutil
     disk_usage = psutil.disk_usage('/')
     mem_usage = psutil.virtual_memory()
-    request_total = DownloadRequest.objects.all().count()
-    request_succeeded = DownloadRequest.objects.filter(status=DownloadRequest.Status.SUCCEEDED).count()
-    request_failed = DownloadRequest.objects.filter(status=DownloadRequest.Status.FAILED).count()
+    snapshot = StatisticsSnapshot.objects.first()
+    history = StatisticsSnapshot.objects.filter(full=True).defer('failures', 'user_stats')
+    if not snapshot:
+        enqueue(MAINTENANCE, 'video_downloading_platform.core.tasks.update_statistics_snapshot')
     stats = {
         'disk': {
             'total': disk_usage[0],
@@ -619,17 +678,8 @@ def statistics_view(request):
             'free': mem_usage[1],
             'percent': mem_usage[2],
         },
-        'failures': __get_failures_per_domain(),
-        'user_stats': __get_user_stats(),
-        'collections': Batch.objects.all().count(),
-        'requests': {
-            'total': request_total,
-            'succeeded': request_succeeded,
-            'failed': request_failed,
-            'percent': 100 * request_succeeded / (1.0 * request_total)
-        },
-        'files': DownloadedContent.objects.all().count(),
-        'users': User.objects.all().count(),
+        'snapshot': snapshot,
+        'history': history[:settings.STATISTICS_HISTORY_SIZE],
     }
     return render(
         request,
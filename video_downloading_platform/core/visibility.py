@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from video_downloading_platform.core.models import Batch
+
+VERSION_CACHE_KEY = 'batch_visibility:version'
+
+
+def is_admin(user):
+    """
+    Whether the user belongs to the admin group, looked up once per user instance.
+    """
+    if not hasattr(user, '_is_admin'):
+        user._is_admin = user.groups.filter(name='admin').exists()
+    return user._is_admin
+
+
+def invalidate_visibility():
+    """
+    Invalidate the visible batches of every user, called whenever a batch or a team changes.
+    """
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+
+
+def _get_cache_key(user):
+    version = cache.get_or_set(VERSION_CACHE_KEY, 1, None)
+    return f'batch_visibility:{version}:{user.id}'
+
+
+def get_visible_batch_ids(user):
+    """
+    Return the IDs of the batches owned by the user or shared with them through a team, grouped by status.
+    They are resolved with a single query and cached until a batch or a team changes.
+    """
+    cache_key = _get_cache_key(user)
+    batch_ids = cache.get(cache_key)
+    if batch_ids is None:
+        batch_ids = {}
+        rows = Batch.objects.filter(Q(owner=user) | Q(team__contributors=user)) \
+            .values_list('id', 'status') \
+            .order_by() \
+            .distinct()
+        for batch_id, status in rows:
+            batch_ids.setdefault(status, set()).add(batch_id)
+        cache.set(cache_key, batch_ids, settings.BATCH_VISIBILITY_CACHE_TTL)
+    return batch_ids
+
+
+def get_visible_batches(user, status=None):
+    """
+    Queryset of the batches the user can see, all of them for admins, optionally restricted to the given status.
+    """
+    if is_admin(user):
+        batches = Batch.objects.all()
+        return batches.filter(status=status) if status else batches
+    batch_ids = get_visible_batch_ids(user)
+    if status:
+        ids = batch_ids.get(status, set())
+    else:
+        ids = set().union(*batch_ids.values())
+    return Batch.objects.filter(id__in=ids)
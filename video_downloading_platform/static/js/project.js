@@ -40,21 +40,104 @@ function notification_toaster_callback(data) {
     })
 }
 
+function update_batch_status(elt) {
+    const submitted_counter = jQuery(`#${elt.id}_submitted`);
+    const succeeded_counter = jQuery(`#${elt.id}_succeeded`);
+    const failed_counter = jQuery(`#${elt.id}_failed`);
+    submitted_counter.text(elt.submitted);
+    succeeded_counter.text(elt.succeeded);
+    failed_counter.text(elt.failed);
+}
+
 function update_batch_statuses() {
     jQuery.get('/batch/statuses', function (data) {
-        data.forEach(function (elt) {
-            const submitted_counter = jQuery(`#${elt.id}_submitted`);
-            const succeeded_counter = jQuery(`#${elt.id}_succeeded`);
-            const failed_counter = jQuery(`#${elt.id}_failed`);
-            submitted_counter.text(elt.submitted);
-            succeeded_counter.text(elt.succeeded);
-            failed_counter.text(elt.failed);
-        })
+        data.forEach(update_batch_status)
     })
 
     setTimeout(update_batch_statuses, 10000);
 }
 
+function watch_batch_statuses() {
+    // Only the pages showing batch counters hold a stream open
+    if (!document.querySelector('[data-batch-counters]')) {
+        return;
+    }
+    // Fall back to polling when server-sent events are not available
+    if (!window.EventSource) {
+        update_batch_statuses();
+        return;
+    }
+    const source = new EventSource('/batch/statuses/events');
+    source.addEventListener('statuses', function (event) {
+        JSON.parse(event.data).forEach(update_batch_status);
+    });
+    source.addEventListener('status', function (event) {
+        update_batch_status(JSON.parse(event.data));
+    });
+    source.onerror = function () {
+        // The browser reconnects on its own unless the stream has been refused
+        if (source.readyState === EventSource.CLOSED) {
+            update_batch_statuses();
+        }
+    };
+}
+
+function load_collection_contents(container_id) {
+    // Load the pages of a collection one after the other as the analyst scrolls down
+    const container = jQuery(`#${container_id}`);
+    const sentinel = document.getElementById(`${container_id}_sentinel`);
+    let next_url = container.data('url');
+    let loading = false;
+    // Pages far from the viewport are emptied, keeping their height, and filled again when scrolled back to. The
+    // DOM stays bounded however far the analyst scrolls.
+    const detached = new Map();
+    const pages = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            const page = entry.target;
+            if (entry.isIntersecting && detached.has(page)) {
+                page.innerHTML = detached.get(page);
+                page.style.height = '';
+                detached.delete(page);
+            } else if (!entry.isIntersecting && !detached.has(page)) {
+                page.style.height = `${page.offsetHeight}px`;
+                detached.set(page, page.innerHTML);
+                page.innerHTML = '';
+            }
+        });
+    }, {rootMargin: '3000px 0px'});
+    const observer = new IntersectionObserver(function (entries) {
+        if (entries.some(entry => entry.isIntersecting)) {
+            load_next_page();
+        }
+    }, {rootMargin: '800px'});
+
+    function load_next_page() {
+        if (!next_url || loading) {
+            return;
+        }
+        loading = true;
+        jQuery.get(next_url, function (data) {
+            const page = jQuery('<div class="collection-page"></div>').html(data.html);
+            container.append(page);
+            pages.observe(page[0]);
+            next_url = data.next;
+            loading = false;
+            if (next_url) {
+                // Observe again to load the next page right away if the sentinel is still visible
+                observer.unobserve(sentinel);
+                observer.observe(sentinel);
+            } else {
+                observer.disconnect();
+                sentinel.remove();
+            }
+        }).fail(function () {
+            loading = false;
+        });
+    }
+
+    observer.observe(sentinel);
+}
+
 function show_modal_form(url) {
     jQuery.get(url, function (data) {
         const container = jQuery('#container');